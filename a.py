@@ -1,21 +1,37 @@
-import feedparser
-from deep_translator import GoogleTranslator
-from datetime import datetime
+from functools import partial
 import time
-from bs4 import BeautifulSoup
 import asyncio
 from dotenv import load_dotenv
 import yaml
 import os
 from supabase import create_client, Client
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from logger_config import setup_logger
+from metrics import METRICS
+from feed_fetcher import fetch, close_session
+from feed_cache import FeedCache
+from feed_health import FeedHealth, CLOSED
+from ollama_client import OllamaClient
+from analysis_cache import AnalysisCache
+from pipeline import Pipeline, Stage
+from translation import TranslationService
+from dedup_index import DedupIndex, normalize_link
+from article_writer import ArticleWriter
+from classifier import CategoryClassifier, article_text
+from near_dup import NearDupIndex
+from html_cleaner import clean_html
+from llm_output import (
+    analysis_schema, json_response_complete, match_category,
+    parse_json_response, parse_text_response, text_response_complete
+)
+from feed_scheduler import FeedScheduler
+from feed_leases import FeedLeases
+import rss_notify
 from dateutil import parser
-from dateutil.relativedelta import relativedelta
-import requests
 from rich.console import Console
-from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TimeRemainingColumn
+from rich.progress import Progress, SpinnerColumn, TextColumn, TimeElapsedColumn
 from rich.panel import Panel
+from rich.table import Table
 from rich import print as rprint
 
 # Load environment variables
@@ -35,96 +51,141 @@ def load_config():
 
 CONFIG = load_config()
 
+# Conditional-GET cache of feed validators, kept across cycles
+feed_cache = FeedCache(CONFIG['fetch']['cache_file'])
+
+# Per-feed latency/error tracking and circuit breaker
+feed_health = FeedHealth(CONFIG['health'])
+
+# Memo of LLM analyses, so repeated content never costs a second generation
+analysis_cache = AnalysisCache(CONFIG['analysis_cache'])
+
+# Local category classifier trained on the LLM's earlier labels
+classifier = CategoryClassifier(CONFIG['classifier'])
+
+# SimHash window of recently analysed stories, for cross-source duplicates
+near_dups = NearDupIndex(CONFIG['near_dup'])
+
+# Cached, batched and rate-limited translator shared by all cycles
+translator = TranslationService(CONFIG['translator'])
+
+# Pooled Ollama client routing generations across the configured endpoints
+ollama = OllamaClient(CONFIG['ollama'])
+
+# Normalized links of stored articles, synced incrementally from Supabase
+dedup_index = DedupIndex(
+    CONFIG['dedup']['index_file'],
+    CONFIG['dedup']['expected_links'],
+    CONFIG['dedup']['false_positive_rate']
+)
+
 # Initialize Supabase client with environment variables
 supabase: Client = create_client(
     os.getenv('SUPABASE_URL'),
     os.getenv('SUPABASE_KEY')
 )
 
-def clean_html(html_text):
-    """Remove HTML tags and clean the text"""
-    if html_text:
-        soup = BeautifulSoup(html_text, 'html.parser')
-        return soup.get_text(separator=' ', strip=True)
-    return ''
-
-def load_existing_articles() -> set:
-    """Load existing article URLs from Supabase"""
+def sync_existing_articles() -> int:
+    """Bring the local dedup index and classifier up to date with Supabase"""
     try:
-        response = supabase.table('articles').select('link').execute()
-        return {article['link'] for article in response.data}
+        synced = dedup_index.sync(supabase, CONFIG['dedup']['sync_page_size'], CONFIG['dedup']['sync_overlap'])
+        pruned = dedup_index.prune(CONFIG['dedup']['max_age_days'])
+        logger.info(f"Dedup index: {synced} rows synced, {pruned} pruned")
     except Exception as e:
-        print(f"Error loading existing articles: {str(e)}")
-        return set()
+        print(f"Error syncing existing articles: {str(e)}")
+        synced = 0
+    
+    if CONFIG['classifier']['mode'] != 'off':
+        try:
+            learned = classifier.sync(supabase, CONFIG['classifier']['sync_page_size'], CONFIG['classifier']['sync_overlap'])
+            logger.info(f"Classifier: learned from {learned} newly labelled articles")
+        except Exception as e:
+            logger.error(f"Error training classifier: {str(e)}")
+    return synced
 
-def save_article(article: Dict[str, Any]):
-    """Save article to Supabase"""
+def on_articles_saved(rows: List[Dict[str, Any]]):
+    """Record flushed articles in the dedup index and tell worker_b which feeds changed"""
+    dedup_index.add_many(row['link'] for row in rows)
+    for row in rows:
+        feed_cache.mark_saved(row.get('source_url'), normalize_link(row['link']))
+    METRICS.incr('articles_saved', len(rows))
     try:
-        # Add created_at timestamp
-        article['created_at'] = datetime.now().isoformat()
-        
-        response = supabase.table('articles').insert(article).execute()
-        return response
-    except Exception as e:
-        print(f"Error saving article: {str(e)}")
-        return None
+        rss_notify.notify(CONFIG['notify']['spool_dir'], (row.get('ai_category') for row in rows))
+    except OSError as e:
+        logger.error(f"Error notifying RSS generator: {str(e)}")
+    console.print(f"[green]✓ Saved {len(rows)} articles[/green]")
+
+# Buffered bulk writer for analysed articles
+writer = ArticleWriter(supabase, CONFIG['writer'], on_flush=on_articles_saved)
 
-def load_categories() -> set:
+def load_categories() -> List[str]:
     """Load valid categories from categories_config.yaml"""
     try:
         with open(CONFIG['ollama']['categories_file'], 'r') as f:
             categories_config = yaml.safe_load(f)
-            return set(categories_config['categories'])
+            return list(dict.fromkeys(categories_config['categories']))
     except Exception as e:
         logger.error(f"Error loading categories: {str(e)}")
-        return set()
+        return []
 
-async def get_ai_analysis(content, max_retries=3):
-    """Get AI-generated title, summary, and category using Ollama"""
-    valid_categories = load_categories()
+# Valid categories, read once; also fills the prompt's {categories}
+CATEGORIES = load_categories()
+
+async def get_ai_analysis(content, max_retries=3, known_category=None):
+    """Get AI-generated title, summary, and category using Ollama
+    
+    With a known_category (from the local classifier) only the title and
+    summary are requested. In structured mode Ollama's output is
+    constrained to a JSON schema whose category must be one of CATEGORIES.
+    Generation stops as soon as every field has been streamed.
+    """
+    settings = CONFIG['ollama']
+    structured = settings['structured']
+    keys = ['title', 'summary'] if known_category else ['title', 'summary', 'category']
+    template = settings[
+        ('structured_' if structured else '')
+        + ('summary_prompt_template' if known_category else 'prompt_template')
+    ]
+    prompt = template.format(content=content, categories=', '.join(CATEGORIES))
+    if structured:
+        response_format = analysis_schema(CATEGORIES, with_category=not known_category)
+        done = json_response_complete
+        parse = parse_json_response
+    else:
+        response_format = None
+        done = partial(text_response_complete, keys=keys)
+        parse = parse_text_response
+    
+    # A changed model, template or content gives a different key
+    cache_key = analysis_cache.key(settings['model'], prompt, response_format)
+    cached = analysis_cache.get(cache_key)
+    if cached:
+        title, summary, category = cached
+        return title, summary, known_category or category
     
     for attempt in range(max_retries):
         try:
-            # Prepare the request to local Ollama server
-            url = "http://localhost:11434/api/generate"
-            
-            # Use the ollama section from config instead of together
-            prompt = CONFIG['ollama']['prompt_template'].format(content=content)
-            
-            payload = {
-                "model": CONFIG['ollama']['model'],
-                "prompt": prompt,
-                "stream": False
-            }
+            # Request a generation from the shared Ollama client
+            response_text = await ollama.generate(prompt, format=response_format, done=done)
+            fields = parse(response_text)
+            title = fields.get('title', '')
+            summary = fields.get('summary', '')
             
-            # Make request to Ollama
-            response = requests.post(url, json=payload)
-            response.raise_for_status()
-            
-            # Extract response text
-            response_text = response.json()['response']
-            
-            # Parse the response
-            title = ""
-            summary = ""
-            category = ""
-            
-            for line in response_text.split('\n'):
-                if line.startswith('TITLE:'):
-                    title = line.replace('TITLE:', '').strip()
-                elif line.startswith('SUMMARY:'):
-                    summary = line.replace('SUMMARY:', '').strip()
-                elif line.startswith('CATEGORY:'):
-                    category = line.replace('CATEGORY:', '').strip()
-            
-            # Validate category
-            if category not in valid_categories:
-                logger.warning(f"Invalid category '{category}' received from AI")
-                if attempt < max_retries - 1:
-                    logger.info("Retrying with the same content...")
-                    continue
-                else:
-                    raise ValueError(f"AI provided invalid category after {max_retries} attempts: {category}")
+            if known_category:
+                category = known_category
+            else:
+                # Map near misses locally rather than generating again
+                raw_category = fields.get('category', '')
+                category = match_category(raw_category, CATEGORIES, settings['category_cutoff'])
+                if category is None:
+                    logger.warning(f"Invalid category '{raw_category}' received from AI")
+                    if attempt < max_retries - 1:
+                        logger.info("Retrying with the same content...")
+                        continue
+                    else:
+                        raise ValueError(f"AI provided invalid category after {max_retries} attempts: {raw_category}")
+                if category != raw_category:
+                    logger.info(f"Mapped category '{raw_category}' to '{category}'")
             
             # Validate response
             if not all([title, summary, category]):
@@ -135,6 +196,8 @@ async def get_ai_analysis(content, max_retries=3):
                     logger.error("Failed to get complete AI analysis after all retries")
                     if not summary:
                         summary = "Summary not available"
+            else:
+                analysis_cache.put(cache_key, title, summary, None if known_category else category)
             
             return title, summary, category
             
@@ -143,114 +206,437 @@ async def get_ai_analysis(content, max_retries=3):
             if attempt == max_retries - 1:
                 raise
 
-async def fetch_and_translate_feeds(url_file):
-    """Fetch articles from RSS feeds and translate them"""
-    existing_urls = load_existing_articles()
+async def fetch_stage(url, emit, in_flight, scheduler=None):
+    """Download and parse a feed, passing on entries not yet stored"""
+    if not feed_health.allow(url):
+        # Circuit open: skip the feed until its backoff expires
+        if scheduler:
+            scheduler.record_failure(url, delay=feed_health.retry_after(url))
+        return
     
+    # None until the fetch gets through; anything raised before then,
+    # expected or not, reschedules the feed as a failure
+    new_entries = None
+    try:
+        started = time.monotonic()
+        result = await fetch(url, CONFIG['fetch'], feed_cache)
+        latency = time.monotonic() - started
+        error = result.error
+        parse_failed = False
+        if error is None and result.feed is not None and result.feed.bozo and not result.feed.entries:
+            # Unparseable body
+            error = result.feed.get('bozo_exception') or ValueError('Feed could not be parsed')
+            parse_failed = True
+        if parse_failed and result.validators:
+            # Nothing to save from this body; skip parsing it again while it stays the same
+            feed_cache.store(url, **result.validators)
+        if error is not None:
+            METRICS.incr('feed_errors')
+            feed_health.record_failure(url, latency, error, parse_failed=parse_failed)
+            raise error
+        if result.status in ('not_modified', 'unchanged'):
+            # Same body as last time, which may have been unparseable
+            feed_health.record_unchanged(url, latency)
+        else:
+            feed_health.record_success(url, latency)
+        
+        entries = []
+        unsaved = set()
+        if result.feed is not None:
+            # Get the last entries
+            for latest_entry in result.feed.entries[:CONFIG['feed']['entries_to_fetch']]:
+                article_url = latest_entry.get('link', '')
+                if article_url in dedup_index:
+                    continue
+                link_key = normalize_link(article_url)
+                unsaved.add(link_key)
+                # Skip ones already queued, e.g. from another feed
+                if link_key in in_flight:
+                    continue
+                in_flight[link_key] = time.time()
+                entries.append(latest_entry)
+        if result.validators:
+            # Until these are saved the feed must not look unchanged
+            feed_cache.store_when_saved(url, result.validators, unsaved)
+        new_entries = entries
+    finally:
+        # Always hand the feed back, or the scheduler never polls it again
+        if scheduler:
+            if new_entries is None:
+                scheduler.record_failure(url, delay=feed_health.retry_after(url))
+            else:
+                # Not-modified feeds count as having nothing new
+                scheduler.record(url, len(new_entries))
+    
+    METRICS.incr('feeds_fetched')
+    METRICS.incr('new_entries', len(new_entries))
+    for latest_entry in new_entries:
+        await emit((url, latest_entry))
+
+async def clean_stage(item, emit):
+    """Extract and clean entry content, short-cutting near-duplicate stories"""
+    url, latest_entry = item
+    with METRICS.timer('clean'):
+        article = {
+            'original_title': clean_html(latest_entry.get('title', '')),
+            'original_description': clean_html(latest_entry.get('description', '')),
+            'link': latest_entry.get('link', ''),
+            'published': latest_entry.get('published', ''),
+            'source_url': url
+        }
+    
+    if CONFIG['near_dup']['enabled']:
+        fingerprint = near_dups.fingerprint(f"{article['original_title']}\n{article['original_description']}")
+        match = near_dups.find(fingerprint) if fingerprint is not None else None
+        if match:
+            # Same story from another source: reuse its analysis and skip
+            # translation and the LLM (original_* stay untranslated)
+            near_dups.record_duplicate(article['link'], url, match)
+            # Untranslated text must not train the classifier
+            classifier.mark_predicted(article['link'])
+            METRICS.incr('near_duplicates')
+            article.update({
+                'ai_title': match['ai_title'],
+                'ai_summary': match['ai_summary'],
+                'ai_category': match['ai_category']
+            })
+            await emit(article, stage='store')
+            return
+        # Carried to the store stage, which adds the analysed article to the index
+        article['_fingerprint'] = fingerprint
+    
+    await emit(article)
+
+async def translate_stage(articles, emit):
+    """Translate titles and descriptions of a batch of articles at once"""
+    texts = []
+    for article in articles:
+        texts.extend([article['original_title'], article['original_description']])
+    with METRICS.timer('translate'):
+        translated = await translator.translate_many(texts)
+    
+    for index, article in enumerate(articles):
+        title, description = translated[2 * index], translated[2 * index + 1]
+        if title is None or description is None:
+            console.print(f"[red]✗ Error translating article:[/red] {article['link']}")
+            continue
+        article['original_title'] = title
+        article['original_description'] = description
+        await emit(article)
+
+def first_words(text: str, count: int) -> str:
+    words = text.split()
+    return ' '.join(words[:count]) + ('…' if len(words) > count else '')
+
+async def analyse_stage(article, emit):
+    """Get AI analysis of the translated content"""
+    # Combine title and description for AI analysis
+    combined_content = f"{article['original_title']}\n\n{article['original_description']}"
+    
+    # Let the local classifier pick the category when it is confident
+    mode = CONFIG['classifier']['mode']
+    category = None
+    if mode != 'off':
+        category = classifier.classify(article_text(article), CATEGORIES)
+    
+    if category and mode == 'category_only':
+        # No LLM call at all: keep the translated title and a trimmed description
+        ai_title = article['original_title']
+        ai_summary = first_words(article['original_description'], CONFIG['classifier']['summary_words'])
+        ai_category = category
+    else:
+        ai_title, ai_summary, ai_category = await get_ai_analysis(combined_content, known_category=category)
+    if category:
+        # Keep the classifier from training on its own labels
+        classifier.mark_predicted(article['link'])
+    article.update({
+        'ai_title': ai_title,
+        'ai_summary': ai_summary,
+        'ai_category': ai_category
+    })
+    await emit(article)
+
+async def store_stage(article, emit):
+    """Hand the analysed article to the buffered Supabase writer"""
+    fingerprint = article.pop('_fingerprint', None)
+    if fingerprint is not None:
+        near_dups.add(article['link'], fingerprint, article)
+    await writer.add(article)
+    console.print(f"[green]✓ Processed:[/green] {article['ai_title']}")
+
+def build_pipeline(in_flight: Dict[str, float], scheduler: Optional[FeedScheduler] = None) -> Pipeline:
+    """Assemble the fetch → clean → translate → analyse → store pipeline"""
+    handlers = {
+        'fetch': partial(fetch_stage, in_flight=in_flight, scheduler=scheduler),
+        'clean': clean_stage,
+        'translate': translate_stage,
+        'analyse': analyse_stage,
+        'store': store_stage
+    }
+    stages = [
+        Stage(name, handler, **CONFIG['pipeline'][name])
+        for name, handler in handlers.items()
+    ]
+    
+    def on_error(stage, item, error):
+        if stage.name == 'fetch':
+            console.print(f"[red]✗ Error processing feed {item}:[/red] {str(error)}")
+        else:
+            console.print(f"[red]✗ Error processing article ({stage.name}):[/red] {str(error)}")
+    
+    return Pipeline(stages, on_error=on_error)
+
+async def monitor_pipeline(pipeline: Pipeline, progress: Progress):
+    """Refresh per-stage queue depth and throughput until cancelled"""
+    tasks = {
+        stage.name: progress.add_task(stage.name, queue=0, busy=0, rate=0.0)
+        for stage in pipeline.stages
+    }
+    
+    def refresh():
+        for snapshot in pipeline.snapshot():
+            progress.update(
+                tasks[snapshot['name']],
+                completed=snapshot['processed'],
+                queue=snapshot['queue'],
+                busy=snapshot['busy'],
+                rate=snapshot['rate']
+            )
+            METRICS.set_gauge('pipeline_queue_depth', snapshot['queue'], snapshot['name'])
+            METRICS.set_gauge('pipeline_busy_workers', snapshot['busy'], snapshot['name'])
+    
+    try:
+        while True:
+            refresh()
+            await asyncio.sleep(0.5)
+    finally:
+        # Leave the final counts on screen
+        refresh()
+
+def load_urls(url_file) -> List[str]:
+    """Read feed URLs, one per line"""
     with open(url_file, 'r') as file:
-        urls = [line.strip() for line in file if line.strip()]
+        return [line.strip() for line in file if line.strip()]
+
+async def start_cycle():
+    """Sync the dedup index, reset per-cycle stats and replay the journal"""
+    METRICS.reset_cycle()
+    await asyncio.to_thread(sync_existing_articles)
+    if CONFIG['near_dup']['enabled']:
+        near_dups.prune()
     
-    translator = GoogleTranslator(
-        source=CONFIG['translator']['source'],
-        target=CONFIG['translator']['target']
-    )
+    feed_cache.reset_stats()
+    feed_health.reset_stats()
+    classifier.reset_stats()
+    near_dups.reset_stats()
+    ollama.reset_stats()
+    analysis_cache.reset_stats()
+    translator.reset_stats()
+    writer.reset_stats()
+    
+    # Retry rows a previous cycle failed to write
+    replayed = await writer.replay_journal()
+    if replayed:
+        console.print(f"[cyan]Replayed {replayed} journaled articles[/cyan]")
+
+def print_feed_health():
+    """Log breaker states and print a table of open, failing and slow feeds"""
+    health_summary = feed_health.summary()
+    logger.info(f"Feed health: {health_summary}")
+    console.print(f"[cyan]Feed health:[/cyan] {health_summary}")
     
-    # Create progress display
+    feeds = feed_health.unhealthy()
+    if not feeds:
+        return
+    table = Table(title="Unhealthy feeds")
+    table.add_column("Feed", overflow="fold")
+    table.add_column("State")
+    table.add_column("Fails", justify="right")
+    table.add_column("Error rate", justify="right")
+    table.add_column("Latency", justify="right")
+    table.add_column("Retry in", justify="right")
+    table.add_column("Last error", max_width=40, no_wrap=True, overflow="ellipsis")
+    for feed in feeds[:CONFIG['health']['table_rows']]:
+        retry_after = feed_health.retry_after(feed['url'])
+        table.add_row(
+            feed['url'],
+            f"[{'green' if feed['state'] == CLOSED else 'red'}]{feed['state']}[/]",
+            str(feed['consecutive_failures']),
+            f"{feed['error_rate']:.0%}",
+            f"{feed['latency']:.1f}s" if feed['latency'] is not None else "-",
+            f"{retry_after / 60:.0f} min" if retry_after is not None else "-",
+            feed['last_error'] or ""
+        )
+    if len(feeds) > CONFIG['health']['table_rows']:
+        table.caption = f"{len(feeds) - CONFIG['health']['table_rows']} more not shown"
+    console.print(table)
+
+def print_stage_times():
+    """Print where this cycle's time went, per stage"""
+    summary = METRICS.cycle_summary()
+    if not summary['stages']:
+        return
+    table = Table(title=f"Stage times ({summary['seconds']:.0f}s cycle)")
+    table.add_column("Stage")
+    table.add_column("Calls", justify="right")
+    table.add_column("Total", justify="right")
+    table.add_column("Avg", justify="right")
+    table.add_column("Max", justify="right")
+    table.add_column("Concurrency", justify="right")
+    for stage, values in summary['stages'].items():
+        table.add_row(
+            stage,
+            str(values['calls']),
+            f"{values['seconds']:.1f}s",
+            f"{values['avg'] * 1000:.0f}ms",
+            f"{values['max'] * 1000:.0f}ms",
+            f"{values['concurrency']:.2f}"
+        )
+    console.print(table)
+
+def report_cycle():
+    """Log and print per-cycle stats and append the cycle's metrics summary"""
+    cache_summary = feed_cache.summary()
+    logger.info(f"Feed cache: {cache_summary}")
+    console.print(f"[cyan]Feed cache:[/cyan] {cache_summary}")
+    print_feed_health()
+    if CONFIG['near_dup']['enabled']:
+        near_dup_summary = near_dups.summary()
+        logger.info(f"Near-duplicates: {near_dup_summary}")
+        console.print(f"[cyan]Near-duplicates:[/cyan] {near_dup_summary}")
+    if CONFIG['classifier']['mode'] != 'off':
+        classifier_summary = classifier.summary()
+        logger.info(f"Classifier: {classifier_summary}")
+        console.print(f"[cyan]Classifier:[/cyan] {classifier_summary}")
+    ollama_summary = ollama.summary()
+    logger.info(f"Ollama: {ollama_summary}")
+    console.print(f"[cyan]Ollama:[/cyan] {ollama_summary}")
+    analysis_summary = analysis_cache.summary()
+    logger.info(f"Analysis cache: {analysis_summary}")
+    console.print(f"[cyan]Analysis cache:[/cyan] {analysis_summary}")
+    translation_summary = translator.summary()
+    logger.info(f"Translation: {translation_summary}")
+    console.print(f"[cyan]Translation:[/cyan] {translation_summary}")
+    writer_summary = writer.summary()
+    logger.info(f"Writer: {writer_summary}")
+    console.print(f"[cyan]Writer:[/cyan] {writer_summary}")
+    print_stage_times()
+    METRICS.write_cycle_summary(
+        CONFIG['metrics']['summary_file'], 'article_processor',
+        feed_cache=feed_cache.summary(), ollama=ollama.summary(),
+        translation=translation_summary, writer=writer_summary
+    )
+
+async def run_pipeline(pipeline: Pipeline, source):
+    """Run the pipeline over a source of feed URLs with a live stage display"""
+    # Create progress display: one row per stage
     with Progress(
         SpinnerColumn(),
-        TextColumn("[bold blue]{task.description}"),
-        BarColumn(),
-        TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
-        TimeRemainingColumn(),
+        TextColumn("[bold blue]{task.description:<10}"),
+        TextColumn("queue [yellow]{task.fields[queue]:>4}[/yellow]"),
+        TextColumn("busy [cyan]{task.fields[busy]:>3}[/cyan]"),
+        TextColumn("done [green]{task.completed:>5.0f}[/green]"),
+        TextColumn("[magenta]{task.fields[rate]:>6.2f}/s"),
+        TimeElapsedColumn(),
         console=console
     ) as progress:
-        
-        # Main feed processing task
-        feed_task = progress.add_task(f"[yellow]Processing feeds...", total=len(urls))
-        
-        for url in urls:
-            try:
-                console.print(f"\n[cyan]Processing feed:[/cyan] [green]{url}[/green]")
-                feed = feedparser.parse(url)
-                
-                # Get the last entries
-                latest_entries = feed.entries[:CONFIG['feed']['entries_to_fetch']]
-                
-                # Add subtask for current feed's entries
-                entry_task = progress.add_task(
-                    f"[blue]Processing articles from current feed...",
-                    total=len(latest_entries)
-                )
-                
-                for latest_entry in latest_entries:
-                    article_url = latest_entry.get('link', '')
-                    
-                    if article_url in existing_urls:
-                        progress.print(f"[yellow]↺ Skipping (already exists):[/yellow] {article_url}")
-                        progress.advance(entry_task)
-                        continue
-                    
-                    try:
-                        # Extract and clean content
-                        original_title = clean_html(latest_entry.get('title', ''))
-                        original_description = clean_html(latest_entry.get('description', ''))
-                        
-                        progress.print("[bold green]Translating content...")
-                        translated_title = translator.translate(original_title)
-                        translated_description = translator.translate(original_description)
-                        
-                        # Combine title and description for AI analysis
-                        combined_content = f"{translated_title}\n\n{translated_description}"
-                        
-                        # Get AI analysis
-                        progress.print("[bold green]Getting AI analysis...")
-                        ai_title, ai_summary, ai_category = await get_ai_analysis(combined_content)
-                        
-                        article = {
-                            'original_title': translated_title,
-                            'original_description': translated_description,
-                            'ai_title': ai_title,
-                            'ai_summary': ai_summary,
-                            'ai_category': ai_category,
-                            'link': article_url,
-                            'published': latest_entry.get('published', ''),
-                            'source_url': url
-                        }
-                        
-                        # Save to Supabase
-                        save_article(article)
-                        progress.print(f"[green]✓ Processed:[/green] {ai_title}")
-                        
-                    except Exception as e:
-                        progress.print(f"[red]✗ Error processing article:[/red] {str(e)}")
-                        
-                    progress.advance(entry_task)
-                    time.sleep(CONFIG['translator']['delay'])
-                
-                progress.remove_task(entry_task)
-                progress.advance(feed_task)
-                
-            except Exception as e:
-                progress.print(f"[red]✗ Error processing feed {url}:[/red] {str(e)}")
-                progress.advance(feed_task)
-
-def delete_old_articles():
-    """Delete articles older than one month"""
-    with console.status("[bold yellow]Deleting old articles...") as status:
+        monitor = asyncio.create_task(monitor_pipeline(pipeline, progress))
         try:
-            one_month_ago = datetime.now() - relativedelta(months=1)
+            await pipeline.run(source)
+            await writer.flush()
+        finally:
+            monitor.cancel()
+            await asyncio.gather(monitor, return_exceptions=True)
+
+async def fetch_and_translate_feeds(url_file):
+    """Fetch articles from RSS feeds and translate them"""
+    await asyncio.gather(start_cycle(), ollama.warm_up())
+    urls = load_urls(url_file)
+    feed_health.forget(urls)
+    await run_pipeline(build_pipeline({}), urls)
+    report_cycle()
+
+def report_schedule(scheduler: FeedScheduler):
+    """Print expected fetch load of the adaptive schedule vs. fixed cycles"""
+    report = scheduler.report(CONFIG['scheduler']['legacy_cycle_seconds'])
+    summary = (
+        f"{report['feeds']} feeds, median interval {report['median_interval'] / 60:.1f} min, "
+        f"{report['adaptive_fetches_per_hour']:.0f} fetches/hour "
+        f"vs {report['legacy_fetches_per_hour']:.0f} with fixed cycles ({report['reduction']:.0%} reduction)"
+    )
+    logger.info(f"Schedule: {summary}")
+    console.print(f"[cyan]Schedule:[/cyan] {summary}")
+
+def assign_feeds(scheduler: FeedScheduler, leases: Optional[FeedLeases]):
+    """Schedule the feeds this worker should poll: its leased share, or all of them without leasing"""
+    urls = load_urls(CONFIG['url_file'])
+    feed_health.forget(urls)
+    if leases is None:
+        scheduler.set_feeds(urls)
+        return
+    owned = sorted(leases.rebalance(urls))
+    logger.debug(f"Leases: {len(owned)} of {len(urls)} feeds, {leases.workers()} workers")
+    # Feeds handed over carry state their previous owner saved
+    feed_health.reload()
+    # Schedule rows of feeds other workers poll stay in the shared state file
+    scheduler.set_feeds(owned, listed=urls)
+
+async def keep_leases(scheduler: FeedScheduler, leases: FeedLeases):
+    """Heartbeat and follow changes to this worker's share of the feeds"""
+    while True:
+        await asyncio.sleep(CONFIG['leases']['heartbeat_interval'])
+        try:
+            assign_feeds(scheduler, leases)
+        except Exception as e:
+            logger.error(f"Error renewing feed leases: {str(e)}")
+
+async def housekeeping(scheduler: FeedScheduler, in_flight: Dict[str, float],
+                       leases: Optional[FeedLeases] = None):
+    """Periodic per-cycle work while the pipeline runs continuously"""
+    while True:
+        await asyncio.sleep(CONFIG['scheduler']['report_interval'])
+        # An error here must not end the task: the pipeline keeps running either way
+        try:
+            report_cycle()
+            report_schedule(scheduler)
+            if leases is not None:
+                console.print(f"[cyan]Leases:[/cyan] {len(scheduler.feeds)} feeds owned, {leases.workers()} workers")
+            
+            # Forget entries that never made it to the writer so they get retried
+            expired = time.time() - CONFIG['scheduler']['in_flight_ttl']
+            for link_key in [key for key, queued_at in in_flight.items() if queued_at < expired]:
+                del in_flight[link_key]
             
-            response = supabase.table('articles')\
-                .delete()\
-                .lt('created_at', one_month_ago.isoformat())\
-                .execute()
-                
-            deleted_count = len(response.data)
-            console.print(f"[green]✓ Deleted {deleted_count} old articles[/green]")
-            return deleted_count
+            # Pick up edits to the feed list
+            assign_feeds(scheduler, leases)
+            await start_cycle()
         except Exception as e:
-            console.print(f"[red]✗ Error deleting old articles: {str(e)}[/red]")
-            return 0
+            logger.error(f"Error in housekeeping: {str(e)}")
+            console.print(f"[red]✗ Error in housekeeping:[/red] {str(e)}")
+
+async def run_continuously():
+    """Process feeds as the adaptive scheduler reports them due, until cancelled"""
+    # With leasing, each worker process polls only its share of the feeds
+    leases = FeedLeases(CONFIG['leases']) if CONFIG['leases']['enabled'] else None
+    scheduler = FeedScheduler(CONFIG['scheduler'])
+    assign_feeds(scheduler, leases)
+    report_schedule(scheduler)
+    
+    in_flight: Dict[str, float] = {}
+    await asyncio.gather(start_cycle(), ollama.warm_up())
+    background = [asyncio.create_task(housekeeping(scheduler, in_flight, leases))]
+    if leases is not None:
+        background.append(asyncio.create_task(keep_leases(scheduler, leases)))
+    try:
+        await run_pipeline(build_pipeline(in_flight, scheduler), scheduler.stream())
+    finally:
+        for task in background:
+            task.cancel()
+        await asyncio.gather(*background, return_exceptions=True)
+        if leases is not None:
+            # Let the other workers take over these feeds straight away
+            leases.release_all()
+            leases.close()
 
 async def main():
     console.print(Panel.fit(
@@ -258,12 +644,23 @@ async def main():
         "[cyan]Starting article processing...[/cyan]"
     ))
     
-    # Delete old articles before processing new ones
-    delete_old_articles()
-    
+    # Old articles are archived and deleted by the retention job in worker_b.py
     await fetch_and_translate_feeds(CONFIG['url_file'])
     
     console.print("\n[bold green]✓ Article processing completed![/bold green]")
 
+async def shutdown():
+    """Release pooled connections held across cycles"""
+    await writer.close()
+    await close_session()
+    await ollama.close()
+
+async def run_once():
+    """Run a single processing cycle and clean up"""
+    try:
+        await main()
+    finally:
+        await shutdown()
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    asyncio.run(run_once())
@@ -0,0 +1,95 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Any, Dict, Optional, Tuple
+
+class AnalysisCache:
+    """SQLite memo of LLM analysis results.
+
+    Entries are keyed by a hash of the model name, the fully rendered
+    prompt (template plus article content) and the requested output
+    format, so changing any of them simply stops old entries from
+    matching. At most ``max_entries`` are kept, evicting the least
+    recently used; entries older than ``ttl_days`` are ignored and pruned.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        self.max_entries = config['max_entries']
+        self.ttl = config['ttl_days'] * 86400
+
+        cache_dir = os.path.dirname(config['cache_file'])
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        self.conn = sqlite3.connect(config['cache_file'])
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS analyses (
+                key TEXT PRIMARY KEY,
+                title TEXT NOT NULL,
+                summary TEXT NOT NULL,
+                category TEXT,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self.conn.execute('CREATE INDEX IF NOT EXISTS analyses_last_used ON analyses (last_used)')
+        self.conn.execute('DELETE FROM analyses WHERE created_at < ?', (time.time() - self.ttl,))
+        self.conn.commit()
+        self.size = self.conn.execute('SELECT COUNT(*) FROM analyses').fetchone()[0]
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Start a new per-cycle tally"""
+        self.stats = {'hits': 0, 'misses': 0, 'evicted': 0}
+
+    @staticmethod
+    def key(model: str, prompt: str, response_format: Any = None) -> str:
+        material = json.dumps([model, prompt, response_format], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[str, str, Optional[str]]]:
+        """Cached (title, summary, category) for a key, if fresh"""
+        now = time.time()
+        row = self.conn.execute(
+            'SELECT title, summary, category FROM analyses WHERE key = ? AND created_at >= ?',
+            (key, now - self.ttl)
+        ).fetchone()
+        if row is None:
+            self.stats['misses'] += 1
+            return None
+        self.stats['hits'] += 1
+        self.conn.execute('UPDATE analyses SET last_used = ? WHERE key = ?', (now, key))
+        self.conn.commit()
+        return row
+
+    def put(self, key: str, title: str, summary: str, category: Optional[str]):
+        now = time.time()
+        cursor = self.conn.execute(
+            'INSERT OR IGNORE INTO analyses VALUES (?, ?, ?, ?, ?, ?)',
+            (key, title, summary, category, now, now)
+        )
+        self.size += cursor.rowcount
+        if self.size > self.max_entries:
+            # Evict a tenth at a time so this doesn't run on every insert
+            excess = self.size - int(self.max_entries * 0.9)
+            cursor = self.conn.execute(
+                'DELETE FROM analyses WHERE key IN '
+                '(SELECT key FROM analyses ORDER BY last_used LIMIT ?)',
+                (excess,)
+            )
+            self.size -= cursor.rowcount
+            self.stats['evicted'] += cursor.rowcount
+        self.conn.commit()
+
+    def summary(self) -> str:
+        """One-line description of this cycle's cache effectiveness"""
+        lookups = self.stats['hits'] + self.stats['misses']
+        rate = self.stats['hits'] / lookups if lookups else 0.0
+        return (
+            f"{self.stats['hits']} hits, {self.stats['misses']} misses ({rate:.0%} hit rate), "
+            f"{self.stats['evicted']} evicted, {self.size} entries"
+        )
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,179 @@
+import asyncio
+import fcntl
+import json
+import os
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+from logger_config import setup_logger
+from metrics import METRICS
+
+logger = setup_logger('article_writer')
+
+@contextmanager
+def _file_lock(path: str, blocking: bool = True):
+    """Exclusive lock held through ``path``, shared by every process on the host; yields whether it was taken"""
+    with open(path, 'a') as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def _ends_with_newline(path: str) -> bool:
+    with open(path, 'rb') as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b'\n'
+
+class ArticleWriter:
+    """Buffers article rows and writes them to Supabase as bulk upserts.
+
+    The buffer is flushed when it reaches ``batch_size`` rows or
+    ``flush_interval`` seconds after the first buffered row, whichever comes
+    first. Failed flushes are retried with exponential backoff; rows that
+    still can't be written are appended to a local JSONL journal, which
+    ``replay_journal`` writes back later. Worker processes on one host
+    share the journal; file locks keep their appends and replays apart.
+    """
+
+    def __init__(self, supabase, config: Dict[str, Any],
+                 on_flush: Optional[Callable[[List[Dict[str, Any]]], None]] = None):
+        self.supabase = supabase
+        self.batch_size = config['batch_size']
+        self.flush_interval = config['flush_interval']
+        self.max_retries = config['max_retries']
+        self.retry_backoff = config['retry_backoff']
+        self.journal_file = config['journal_file']
+        journal_dir = os.path.dirname(self.journal_file)
+        if journal_dir:
+            os.makedirs(journal_dir, exist_ok=True)
+        self.on_flush = on_flush
+        self.buffer: List[Dict[str, Any]] = []
+        self.lock = asyncio.Lock()
+        self._timer: Optional[asyncio.Task] = None
+        self.stats = {'written': 0, 'flushes': 0, 'retries': 0, 'spilled': 0}
+
+    async def add(self, article: Dict[str, Any]):
+        """Queue an article for writing"""
+        self.buffer.append(article)
+        if len(self.buffer) >= self.batch_size:
+            await self.flush()
+        elif self._timer is None or self._timer.done():
+            self._timer = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_interval)
+        await self.flush()
+
+    async def flush(self):
+        """Write everything buffered so far"""
+        async with self.lock:
+            rows, self.buffer = self.buffer, []
+            if rows:
+                await self._write_or_spill(rows)
+
+    async def _write_or_spill(self, rows: List[Dict[str, Any]]):
+        # A single upsert must not touch the same link twice
+        rows = list({row['link']: row for row in rows}.values())
+        for start in range(0, len(rows), self.batch_size):
+            batch = rows[start:start + self.batch_size]
+            if await self._write(batch):
+                self.stats['written'] += len(batch)
+                if self.on_flush:
+                    self.on_flush(batch)
+            else:
+                self._spill(batch)
+
+    async def _write(self, rows: List[Dict[str, Any]]) -> bool:
+        for attempt in range(self.max_retries):
+            # Stamped per attempt: syncs that follow created_at must not find
+            # rows appearing behind their watermark
+            created_at = datetime.now().isoformat()
+            for row in rows:
+                row['created_at'] = created_at
+            try:
+                with METRICS.timer('insert'):
+                    await asyncio.to_thread(
+                        lambda: self.supabase.table('articles').upsert(rows, on_conflict='link').execute()
+                    )
+                self.stats['flushes'] += 1
+                return True
+            except Exception as e:
+                logger.error(f"Error writing {len(rows)} articles (attempt {attempt + 1}): {str(e)}")
+                if attempt < self.max_retries - 1:
+                    self.stats['retries'] += 1
+                    await asyncio.sleep(self.retry_backoff * 2 ** attempt)
+        return False
+
+    def _spill(self, rows: List[Dict[str, Any]]):
+        with _file_lock(f"{self.journal_file}.lock"), \
+                open(self.journal_file, 'a', encoding='utf-8') as f:
+            # Start on a fresh line if an interrupted spill left a partial one
+            if f.tell() and not _ends_with_newline(self.journal_file):
+                f.write('\n')
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii=False) + '\n')
+        self.stats['spilled'] += len(rows)
+        logger.warning(f"Spilled {len(rows)} articles to {self.journal_file}")
+
+    async def replay_journal(self) -> int:
+        """Write rows left in the journal by earlier failed flushes"""
+        # Rows are moved aside first so that ones failing again are spilled
+        # afresh; a replay file left by an interrupted run is picked up too
+        replaying = f"{self.journal_file}.replay"
+        async with self.lock:
+            with _file_lock(f"{replaying}.lock", blocking=False) as acquired:
+                if not acquired:
+                    # Another worker process on this host is replaying the journal right now
+                    return 0
+                # Claim the journal; concurrent spills wait for the lock and start a new one
+                with _file_lock(f"{self.journal_file}.lock"):
+                    if os.path.exists(self.journal_file):
+                        with open(self.journal_file, 'r', encoding='utf-8') as f, \
+                                open(replaying, 'a', encoding='utf-8') as out:
+                            if out.tell() and not _ends_with_newline(replaying):
+                                out.write('\n')
+                            out.write(f.read())
+                        os.remove(self.journal_file)
+                if not os.path.exists(replaying):
+                    return 0
+                rows, bad_lines = [], []
+                with open(replaying, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        if not line.strip():
+                            continue
+                        try:
+                            rows.append(json.loads(line))
+                        except json.JSONDecodeError:
+                            bad_lines.append(line.rstrip('\n'))
+                if bad_lines:
+                    # E.g. the partial last line of a spill cut short by a crash
+                    bad_file = f"{self.journal_file}.bad"
+                    with open(bad_file, 'a', encoding='utf-8') as f:
+                        for line in bad_lines:
+                            f.write(line + '\n')
+                    logger.warning(f"Moved {len(bad_lines)} unreadable journal lines to {bad_file}")
+                logger.info(f"Replaying {len(rows)} journaled articles")
+                await self._write_or_spill(rows)
+                os.remove(replaying)
+                return len(rows)
+
+    async def close(self):
+        """Stop the flush timer and write any remaining rows"""
+        await self.flush()
+        if self._timer is not None:
+            self._timer.cancel()
+
+    def reset_stats(self):
+        for key in self.stats:
+            self.stats[key] = 0
+
+    def summary(self) -> str:
+        return (
+            f"{self.stats['written']} written in {self.stats['flushes']} upserts, "
+            f"{self.stats['retries']} retries, {self.stats['spilled']} spilled to journal"
+        )
@@ -1,15 +1,29 @@
 from supabase import create_client, Client
-from feedgen.feed import FeedGenerator
 from datetime import datetime
+from collections import Counter
+from itertools import groupby
+from typing import Dict, Iterable, Iterator, Optional, Tuple
 import pytz
-import tempfile
+import json
 import os
+import yaml
+from concurrent.futures import ThreadPoolExecutor
 from logger_config import setup_logger
+from metrics import METRICS
+import rss_writer
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+def load_config():
+    """Load configuration from yaml file"""
+    with open('config.yaml', 'r') as f:
+        config = yaml.safe_load(f)
+    return config
+
+CONFIG = load_config()
+
 # Initialize Supabase client with environment variables
 supabase: Client = create_client(
     os.getenv('SUPABASE_URL'),
@@ -19,123 +33,274 @@ supabase: Client = create_client(
 # Add at the top after imports
 logger = setup_logger('rss_generator')
 
-def load_articles_from_supabase():
-    """Load articles from Supabase database"""
+# Only the columns the feeds are built from
+FEED_COLUMNS = 'ai_category, ai_title, ai_summary, link, published, created_at'
+
+# Public URL of the rss-feeds storage bucket
+FEED_BASE_URL = 'https://vyfeecfsnvjanhzaojvq.supabase.co/storage/v1/object/public/rss-feeds'
+
+def load_state() -> Dict:
+    """Load the change watermark and per-category manifest"""
     try:
-        logger.info("Loading articles from Supabase")
-        response = supabase.table('articles').select('*').execute()
-        logger.info(f"Successfully loaded {len(response.data)} articles")
-        return response.data
-    except Exception as e:
-        logger.error(f"Error loading articles from Supabase: {str(e)}", exc_info=True)
-        return []
+        with open(CONFIG['rss']['state_file'], 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'watermark': None, 'categories': {}, 'retry': []}
+
+def save_state(state: Dict):
+    """Persist the change watermark and per-category manifest"""
+    state_file = CONFIG['rss']['state_file']
+    state_dir = os.path.dirname(state_file)
+    if state_dir:
+        os.makedirs(state_dir, exist_ok=True)
+    tmp_path = f"{state_file}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, state_file)
+
+def count_articles(category: Optional[str] = None) -> int:
+    """Count stored articles, optionally within one category"""
+    query = supabase.table('articles').select('link', count='exact').limit(1)
+    if category is not None:
+        query = query.eq('ai_category', category)
+    return query.execute().count
+
+def find_changed_categories(state: Dict) -> Tuple[set, Optional[str]]:
+    """Return categories touched since the watermark and the new watermark.
+
+    New rows are read after the watermark. Deleted rows (and rows that
+    arrived with an older created_at) are found by comparing row counts with
+    the manifest: the table total first, per category only on a mismatch.
+    """
+    watermark = state['watermark']
+    page_size = CONFIG['rss']['page_size']
+    new_counts = Counter()
+    while True:
+        rows = supabase.table('articles')\
+            .select('ai_category, created_at')\
+            .gt('created_at', watermark)\
+            .order('created_at')\
+            .limit(page_size)\
+            .execute().data
+        for row in rows:
+            if row.get('ai_category'):
+                new_counts[row['ai_category']] += 1
+        if rows:
+            watermark = rows[-1]['created_at']
+        if len(rows) < page_size:
+            break
 
-def upload_to_supabase_storage(feed_content: str, filename: str):
-    """Upload RSS feed content to Supabase storage"""
+    manifest = state['categories']
+    changed = set(new_counts) | set(state.get('retry', []))
+    expected_total = sum(entry['count'] for entry in manifest.values()) + sum(new_counts.values())
+    if count_articles() != expected_total:
+        for category in set(manifest) | set(new_counts):
+            expected = manifest.get(category, {}).get('count', 0) + new_counts[category]
+            if count_articles(category) != expected:
+                changed.add(category)
+    return changed, watermark
+
+def latest_created_at() -> Optional[str]:
+    """created_at of the newest stored article"""
+    rows = supabase.table('articles')\
+        .select('created_at')\
+        .order('created_at', desc=True)\
+        .limit(1)\
+        .execute().data
+    return rows[0]['created_at'] if rows else None
+
+def _quote(value: str) -> str:
+    """Quote a value for use inside a PostgREST logical filter"""
+    return '"' + str(value).replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+def iter_articles(categories: Optional[Iterable[str]] = None) -> Iterator[Dict]:
+    """Stream the feed columns of stored articles, optionally only some categories.
+
+    Rows come ordered by category and then newest first, fetched page by page
+    with keyset pagination on (ai_category, created_at, link). At most
+    ``rss.max_entries_per_category`` rows are read per category; once a
+    category is full the next page starts at the following category.
+    """
+    page_size = CONFIG['rss']['page_size']
+    cap = CONFIG['rss']['max_entries_per_category']
+    logger.info("Streaming articles from Supabase")
+    
+    after = None        # (category, created_at, link) of the last row read
+    full_category = None
+    current, seen = None, 0
+    total = 0
+    while True:
+        query = supabase.table('articles')\
+            .select(FEED_COLUMNS)\
+            .not_.is_('ai_category', 'null')\
+            .not_.is_('created_at', 'null')\
+            .order('ai_category')\
+            .order('created_at', desc=True)\
+            .order('link', desc=True)\
+            .limit(page_size)
+        if categories is not None:
+            query = query.in_('ai_category', list(categories))
+        if full_category is not None:
+            query = query.gt('ai_category', full_category)
+        elif after is not None:
+            category, created_at, link = (_quote(value) for value in after)
+            query = query.or_(
+                f"ai_category.gt.{category},"
+                f"and(ai_category.eq.{category},created_at.lt.{created_at}),"
+                f"and(ai_category.eq.{category},created_at.eq.{created_at},link.lt.{link})"
+            )
+        rows = query.execute().data
+        
+        full_category = None
+        for row in rows:
+            if row['ai_category'] != current:
+                current, seen = row['ai_category'], 0
+            if seen >= cap:
+                continue
+            seen += 1
+            total += 1
+            yield row
+        
+        if len(rows) < page_size:
+            break
+        last = rows[-1]
+        if seen >= cap:
+            full_category = last['ai_category']
+        else:
+            after = (last['ai_category'], last['created_at'], last['link'])
+    
+    logger.info(f"Streamed {total} articles")
+
+def upload_to_supabase_storage(content: bytes, filename: str, content_type: str):
+    """Upload a file to Supabase storage, replacing any existing copy"""
     try:
         logger.info(f"Uploading {filename} to Supabase storage")
-        # Create a temporary file with UTF-8 encoding
-        with tempfile.NamedTemporaryFile(mode='w+', delete=False, suffix='.xml', encoding='utf-8') as tmp_file:
-            # Write content to temporary file
-            tmp_file.write(feed_content)
-            tmp_file.flush()
-            tmp_path = tmp_file.name
-
-        try:
-            # Upload the temporary file to Supabase storage
-            with open(tmp_path, 'rb') as f:  # Note: using 'rb' mode for binary reading
-                response = supabase.storage.from_('rss-feeds').upload(
-                    path=filename,
-                    file=f,
-                    file_options={"content-type": "application/xml; charset=utf-8"}
-                )
-            logger.info(f"Successfully uploaded {filename}")
-            return response
-        finally:
-            # Clean up: remove temporary file
-            os.unlink(tmp_path)
-            
+        with METRICS.timer('upload'):
+            response = supabase.storage.from_('rss-feeds').upload(
+                path=filename,
+                file=content,
+                file_options={"content-type": content_type, "upsert": "true"}
+            )
+        METRICS.incr('uploaded_bytes', len(content))
+        logger.info(f"Successfully uploaded {filename}")
+        return response
     except Exception as e:
         logger.error(f"Error uploading to Supabase storage: {str(e)}", exc_info=True)
         return None
 
-def create_category_feeds(articles):
-    """Group articles by category and create RSS feeds"""
-    # Group articles by category
-    category_articles = {}
-    for article in articles:
-        category = article.get('ai_category')
-        if category:
-            if category not in category_articles:
-                category_articles[category] = []
-            category_articles[category].append(article)
-
-    # Create RSS feed for each category
-    for category, category_articles in category_articles.items():
-        fg = FeedGenerator()
-        fg.title(f'News - {category}')
-        fg.description(f'News articles related to {category}')
-        
-        # Fix: Replace both spaces, underscores, and forward slashes with hyphens
-        filename = f'{category.lower().replace(" ", "-").replace("_", "-").replace("/", "-")}.xml'
-        
-        # Ensure no double hyphens
-        while '--' in filename:
-            filename = filename.replace('--', '-')
-            
-        fg.link(href=f'https://vyfeecfsnvjanhzaojvq.supabase.co/storage/v1/object/public/rss-feeds/{filename}')
-        
-        fg.language('en')
-
-        # Add entries to feed
-        for article in category_articles:
-            fe = fg.add_entry()
-            fe.title(article.get('ai_title', 'No Title'))
-            fe.description(article.get('ai_summary', 'No Summary'))
-            fe.link(href=article.get('link', '#'))
+def category_filename(category: str) -> str:
+    """Storage file name of a category's feed"""
+    # Fix: Replace both spaces, underscores, and forward slashes with hyphens
+    filename = f'{category.lower().replace(" ", "-").replace("_", "-").replace("/", "-")}.xml'
+    
+    # Ensure no double hyphens
+    while '--' in filename:
+        filename = filename.replace('--', '-')
+    return filename
+
+def upload_feed(feed: bytes, filename: str) -> bool:
+    """Upload a feed and its gzip-precompressed variant"""
+    return (
+        upload_to_supabase_storage(feed, filename, "application/xml; charset=utf-8") is not None
+        and upload_to_supabase_storage(rss_writer.compress(feed), f"{filename}.gz", "application/gzip") is not None
+    )
+
+def create_category_feeds(articles: Iterable[Dict], manifest: Dict[str, Dict]) -> Dict[str, Optional[Dict]]:
+    """Create and upload an RSS feed per category from a category-ordered stream.
+
+    Only one category's articles are held in memory at a time. Feeds whose
+    content hash matches the last published one are not uploaded again;
+    the rest are uploaded in a thread pool. Returns a manifest entry for
+    every category built, or None where the upload failed.
+    """
+    results = {}
+    uploads = {}
+    with ThreadPoolExecutor(max_workers=CONFIG['rss']['upload_workers']) as executor:
+        for category, category_articles in groupby(articles, key=lambda article: article['ai_category']):
+            category_articles = list(category_articles)
+            filename = category_filename(category)
+            with METRICS.timer('xml_build'):
+                feed = rss_writer.build_feed(
+                    title=f'News - {category}',
+                    link=f'{FEED_BASE_URL}/{filename}',
+                    description=f'News articles related to {category}',
+                    entries=category_articles
+                )
+            entry = {
+                'filename': filename,
+                'entries': len(category_articles),
+                'hash': rss_writer.feed_hash(feed),
+                'updated_at': datetime.now(pytz.UTC).isoformat()
+            }
             
-            # Parse and set publication date
-            try:
-                pub_date = datetime.strptime(article.get('published', ''), 
-                                           '%a, %d %b %Y %H:%M:%S %z')
-            except ValueError:
-                try:
-                    # Try parsing created_at if published date fails
-                    pub_date = datetime.fromisoformat(article.get('created_at', '').replace('Z', '+00:00'))
-                except ValueError:
-                    pub_date = datetime.now(pytz.UTC)
+            previous = manifest.get(category) or {}
+            if previous.get('hash') == entry['hash']:
+                logger.info(f"{filename} unchanged, skipping upload")
+                METRICS.incr('feeds_unchanged')
+                results[category] = {**entry, 'updated_at': previous.get('updated_at')}
+                continue
             
-            fe.published(pub_date)
-
-        # Generate feed content as string
-        feed_content = fg.rss_str(pretty=True).decode('utf-8')
-        
-        # Upload to Supabase storage
-        # Try to delete existing file first (ignore errors)
-        try:
-            supabase.storage.from_('rss-feeds').remove([filename])
-        except:
-            pass
-        
-        # Upload new file
-        upload_to_supabase_storage(feed_content, filename)
+            results[category] = entry
+            METRICS.incr('feeds_built')
+            uploads[category] = executor.submit(upload_feed, feed, filename)
+    
+    for category, upload in uploads.items():
+        if not upload.result():
+            results[category] = None
+    
+    return results
 
-def main():
+def main(categories: Optional[Iterable[str]] = None):
+    """Regenerate feeds of changed categories, plus any ``categories`` named by a notification"""
+    METRICS.reset_cycle()
     try:
-        # Load articles from Supabase
-        articles = load_articles_from_supabase()
+        state = load_state()
+        
+        if state['watermark'] is None:
+            # First run: build every category and record the manifest
+            watermark = latest_created_at()
+            if watermark is None:
+                print("No articles found in database")
+                return
+            changed = None
+            state['categories'] = {}
+        else:
+            # The scan only reads rows newer than the watermark, so it stays
+            # cheap even when run on every notification
+            changed, watermark = find_changed_categories(state)
+            changed |= set(categories or ())
+            if not changed:
+                print("No article changes since the last run; feeds are up to date")
+                return
+            logger.info(f"Regenerating {len(changed)} changed categories: {', '.join(sorted(changed))}")
         
-        if not articles:
-            print("No articles found in database")
-            return
-            
         # Create and upload RSS feeds by category
-        create_category_feeds(articles)
+        results = create_category_feeds(iter_articles(changed), state['categories'])
+        
+        manifest = state['categories']
+        for category in changed or ():
+            manifest.pop(category, None)
+        for category, entry in results.items():
+            if entry is not None:
+                # Feeds are capped, so the manifest records the full row count
+                entry['count'] = count_articles(category)
+                manifest[category] = entry
+        
+        # Categories whose upload failed are rebuilt next time
+        state['retry'] = sorted(category for category, entry in results.items() if entry is None)
+        state['watermark'] = watermark
+        save_state(state)
         
-        print("RSS feeds generation and upload completed successfully!")
+        uploaded = len(results) - len(state['retry'])
+        print(f"RSS feeds generation and upload completed successfully! ({uploaded} categories updated)")
         
     except Exception as e:
         print(f"Error generating RSS feeds: {str(e)}")
+    finally:
+        METRICS.write_cycle_summary(
+            CONFIG['metrics']['summary_file'], 'rss_generator',
+            notified_categories=sorted(categories or ())
+        )
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
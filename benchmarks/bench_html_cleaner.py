@@ -0,0 +1,112 @@
+"""Check html_cleaner against the BeautifulSoup cleaner and compare throughput per path.
+
+Every title and description in the corpus is cleaned both ways; any output
+that differs from BeautifulSoup is reported and makes the script exit 1.
+
+Usage: python benchmarks/bench_html_cleaner.py [--corpus FILE] [--repeat 5]
+       python benchmarks/bench_html_cleaner.py --capture [--corpus FILE]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+
+import feedparser
+from bs4 import BeautifulSoup
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import html_cleaner
+
+DEFAULT_CORPUS = os.path.join(ROOT, 'benchmarks', 'fixtures', 'feed_entries.jsonl')
+
+def clean_with_bs4(html_text):
+    """The cleaner a.py used before html_cleaner"""
+    if html_text:
+        soup = BeautifulSoup(html_text, 'html.parser')
+        return soup.get_text(separator=' ', strip=True)
+    return ''
+
+def capture(url_file, corpus_file, entries_per_feed):
+    """Save the raw titles and descriptions of the feeds in url_file"""
+    with open(url_file, 'r') as f:
+        urls = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    count = 0
+    with open(corpus_file, 'w', encoding='utf-8') as out:
+        for url in urls:
+            feed = feedparser.parse(url)
+            for entry in feed.entries[:entries_per_feed]:
+                record = {'title': entry.get('title', ''), 'description': entry.get('description', '')}
+                out.write(json.dumps(record, ensure_ascii=False) + '\n')
+                count += 1
+            print(f"{url}: {min(len(feed.entries), entries_per_feed)} entries")
+    print(f"Captured {count} entries from {len(urls)} feeds into {corpus_file}")
+
+def load_texts(corpus_file):
+    texts = []
+    with open(corpus_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                texts.extend([entry.get('title', ''), entry.get('description', '')])
+    return texts
+
+def best_of(function, texts, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for text in texts:
+            function(text)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS)
+    parser.add_argument('--capture', action='store_true',
+                        help='fetch the feeds in url.md into --corpus instead of benchmarking')
+    parser.add_argument('--url-file', default=os.path.join(ROOT, 'url.md'))
+    parser.add_argument('--entries-per-feed', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    if args.capture:
+        capture(args.url_file, args.corpus, args.entries_per_feed)
+        return
+
+    texts = [text for text in load_texts(args.corpus) if text]
+    by_path = defaultdict(list)
+    for text in texts:
+        by_path[html_cleaner.choose_path(text)].append(text)
+
+    mismatches = []
+    for text in texts:
+        expected = clean_with_bs4(text)
+        actual = html_cleaner.clean_html(text)
+        if actual != expected:
+            mismatches.append((html_cleaner.choose_path(text), text, expected, actual))
+
+    print(f"{len(texts)} non-empty texts from {args.corpus}, best of {args.repeat}")
+    print(f"{'path':<10}{'texts':>8}{'KB':>10}{'bs4 s':>10}{'tiered s':>10}{'speedup':>10}{'mismatch':>10}")
+    rows = [(path, by_path[path]) for path in ('plain', 'simple')] + [('all', texts)]
+    for path, group in rows:
+        if not group:
+            continue
+        size = sum(len(text.encode('utf-8')) for text in group) / 1024
+        bs4_time = best_of(clean_with_bs4, group, args.repeat)
+        tiered_time = best_of(lambda text: html_cleaner.clean_html(text), group, args.repeat)
+        wrong = len(mismatches) if path == 'all' else sum(1 for m in mismatches if m[0] == path)
+        print(f"{path:<10}{len(group):>8}{size:>10.1f}{bs4_time:>10.4f}{tiered_time:>10.4f}"
+              f"{bs4_time / tiered_time:>9.1f}x{wrong:>10}")
+
+    for path, text, expected, actual in mismatches:
+        print(f"\nMismatch on the {path} path for {text[:80]!r}")
+        print(f"  bs4:    {expected[:160]!r}")
+        print(f"  tiered: {actual[:160]!r}")
+    if mismatches:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+"""End-to-end throughput of a.py and b.py against local stand-ins, fully offline.
+
+Fixture feeds and a streaming stub Ollama are served from this process;
+each size runs a.fetch_and_translate_feeds and b.create_category_feeds in
+a fresh child process (so module state and peak RSS are per run) against an
+in-process PostgREST/storage stand-in and a fake translator. Results are
+saved as JSON so revisions can be compared.
+
+Usage: python benchmarks/bench_pipeline.py [--sizes 10 100 1000] [--cycles 2]
+           [--ollama-latency 0.05] [--output FILE] [--compare OLD.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+import yaml
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, ROOT)
+import stubs
+
+# Any well-formed JWT; the stand-in does not check it
+FAKE_KEY = 'eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoiYW5vbiJ9.benchmark'
+
+def percentile(values, fraction):
+    """Nearest-rank percentile; None for no values"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+# Child: one size, one process
+
+class Recorder:
+    """Per-stage busy time and per-article latency of one cycle"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.busy = defaultdict(float)
+        self.fetched = {}
+        self.saved = {}
+
+    def instrument(self, pipeline):
+        for stage in pipeline.stages:
+            stage.handler = self._timed(stage.name, stage.handler)
+        return pipeline
+
+    def _timed(self, name, handler):
+        recorder = self
+
+        async def timed(item, emit):
+            # Time spent blocked on a full downstream queue is not the stage's own work
+            blocked = 0.0
+
+            async def timed_emit(result, stage=None):
+                nonlocal blocked
+                if name == 'fetch':
+                    recorder.fetched.setdefault(result[1].get('link', ''), time.perf_counter())
+                started = time.perf_counter()
+                await emit(result, stage=stage)
+                blocked += time.perf_counter() - started
+
+            started = time.perf_counter()
+            try:
+                await handler(item, timed_emit)
+            finally:
+                recorder.busy[name] += time.perf_counter() - started - blocked
+
+        return timed
+
+    def on_flush(self, rows):
+        now = time.perf_counter()
+        for row in rows:
+            self.saved.setdefault(row['link'], now)
+
+    def latencies(self):
+        return [self.saved[link] - self.fetched[link] for link in self.saved if link in self.fetched]
+
+def run_child(run_dir: str, cycles: int, translate_latency: float):
+    os.chdir(run_dir)
+    stand_in = stubs.PostgrestStandIn()
+    os.environ['SUPABASE_URL'] = stand_in.url
+    os.environ['SUPABASE_KEY'] = FAKE_KEY
+
+    import translation
+    stubs.FakeTranslator.latency = translate_latency
+    translation.GoogleTranslator = stubs.FakeTranslator
+
+    import a
+    import b
+
+    recorder = Recorder()
+    stages = {}
+    build_pipeline = a.build_pipeline
+
+    def instrumented_build_pipeline(*args, **kwargs):
+        pipeline = recorder.instrument(build_pipeline(*args, **kwargs))
+        stages['current'] = pipeline.stages
+        return pipeline
+
+    a.build_pipeline = instrumented_build_pipeline
+    on_flush = a.writer.on_flush
+
+    def recorded_on_flush(rows):
+        recorder.on_flush(rows)
+        on_flush(rows)
+
+    a.writer.on_flush = recorded_on_flush
+
+    async def run_cycles():
+        results = []
+        try:
+            for cycle in range(cycles):
+                recorder.reset()
+                started = time.perf_counter()
+                await a.fetch_and_translate_feeds(a.CONFIG['url_file'])
+                elapsed = time.perf_counter() - started
+                latencies = recorder.latencies()
+                results.append({
+                    'cycle': cycle + 1,
+                    'seconds': elapsed,
+                    'articles': len(recorder.saved),
+                    'articles_per_second': len(recorder.saved) / elapsed if elapsed else 0.0,
+                    'latency_p50': percentile(latencies, 0.5),
+                    'latency_p99': percentile(latencies, 0.99),
+                    'peak_rss_mb': peak_rss_mb(),
+                    'stages': {
+                        stage.name: {
+                            'busy_seconds': recorder.busy[stage.name],
+                            'items': stage.processed,
+                            'errors': stage.errors
+                        }
+                        for stage in stages['current']
+                    },
+                    'translator_calls': stubs.FakeTranslator.calls,
+                    'postgrest_requests': stand_in.requests
+                })
+        finally:
+            await a.shutdown()
+        return results
+
+    cycle_results = asyncio.run(run_cycles())
+
+    # b.py: build and upload every category feed, then again with nothing changed
+    started = time.perf_counter()
+    manifest = b.create_category_feeds(b.iter_articles(), {})
+    build_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    b.create_category_feeds(b.iter_articles(), {category: entry for category, entry in manifest.items() if entry})
+    unchanged_seconds = time.perf_counter() - started
+
+    result = {
+        'cycles': cycle_results,
+        'rss': {
+            'seconds': build_seconds,
+            'unchanged_seconds': unchanged_seconds,
+            'categories': len(manifest),
+            'failed': sum(1 for entry in manifest.values() if entry is None),
+            'entries': sum(entry['entries'] for entry in manifest.values() if entry),
+            'uploaded_bytes': sum(len(data) for data in stand_in.objects.values())
+        },
+        'stored_articles': len(stand_in.tables.get('articles', [])),
+        'peak_rss_mb': peak_rss_mb()
+    }
+    with open(os.path.join(run_dir, 'result.json'), 'w') as f:
+        json.dump(result, f, indent=2)
+    stand_in.close()
+
+# Driver
+
+def bench_config(base, ollama_url, categories_file):
+    """The repo's config pointed at the stand-ins; everything else unchanged"""
+    config = json.loads(json.dumps(base))
+    config['url_file'] = 'url.md'
+    max_concurrent = (base['ollama'].get('endpoints') or [{}])[0].get('max_concurrent', base['ollama']['max_concurrent'])
+    config['ollama']['endpoints'] = [{'url': ollama_url, 'max_concurrent': max_concurrent}]
+    config['ollama']['categories_file'] = categories_file
+    # The fake translator has no quota to protect
+    config['translator']['requests_per_second'] = 1000
+    config['translator']['burst'] = 1000
+    return config
+
+def revision() -> str:
+    try:
+        head = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT,
+                               capture_output=True, text=True).stdout.strip()
+        return head + ('-dirty' if dirty else '')
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+def run_size(args, workdir, feeds, feed_url, ollama_url, categories_file, base_config, ollama_stats):
+    run_dir = os.path.join(workdir, f'feeds-{feeds}')
+    os.makedirs(run_dir)
+    with open(os.path.join(run_dir, 'url.md'), 'w') as f:
+        f.write(''.join(f'{feed_url}/feeds/feed{index}.xml\n' for index in range(feeds)))
+    with open(os.path.join(run_dir, 'config.yaml'), 'w') as f:
+        yaml.safe_dump(bench_config(base_config, ollama_url, categories_file), f, allow_unicode=True)
+
+    before = dict(ollama_stats)
+    command = [sys.executable, os.path.abspath(__file__), '--child', run_dir,
+               '--cycles', str(args.cycles), '--translate-latency', str(args.translate_latency)]
+    with open(os.path.join(run_dir, 'output.log'), 'w') as log:
+        completed = subprocess.run(command, cwd=run_dir, stdout=log, stderr=subprocess.STDOUT)
+    if completed.returncode != 0:
+        raise RuntimeError(f"{feeds} feeds: child failed, see {run_dir}/output.log")
+    with open(os.path.join(run_dir, 'result.json')) as f:
+        result = json.load(f)
+    result['feeds'] = feeds
+    result['ollama'] = {key: ollama_stats[key] - before.get(key, 0) for key in ollama_stats}
+    return result
+
+def print_results(results):
+    print(f"{'feeds':>6}{'cycle':>6}{'articles':>10}{'seconds':>9}{'art/s':>9}"
+          f"{'p50 s':>8}{'p99 s':>8}{'RSS MB':>8}  busiest stages")
+    for run in results['runs']:
+        for cycle in run['cycles']:
+            stages = sorted(cycle['stages'].items(), key=lambda item: -item[1]['busy_seconds'])
+            busiest = ', '.join(f"{name} {stage['busy_seconds']:.1f}s" for name, stage in stages[:3])
+            p50, p99 = cycle['latency_p50'], cycle['latency_p99']
+            print(f"{run['feeds']:>6}{cycle['cycle']:>6}{cycle['articles']:>10}{cycle['seconds']:>9.2f}"
+                  f"{cycle['articles_per_second']:>9.1f}"
+                  f"{p50 if p50 is not None else float('nan'):>8.2f}{p99 if p99 is not None else float('nan'):>8.2f}"
+                  f"{cycle['peak_rss_mb']:>8.0f}  {busiest}")
+        rss = run['rss']
+        print(f"{'':>6} b.py: {rss['categories']} category feeds, {rss['entries']} entries in {rss['seconds']:.2f}s, "
+              f"unchanged rerun {rss['unchanged_seconds']:.2f}s")
+
+def print_comparison(old, new):
+    print(f"\nAgainst {old['revision']} ({old['created_at']}), first cycle:")
+    old_runs = {run['feeds']: run for run in old['runs']}
+    for run in new['runs']:
+        previous = old_runs.get(run['feeds'])
+        if previous is None:
+            continue
+        before, after = previous['cycles'][0], run['cycles'][0]
+        parts = []
+        for key, label in (('articles_per_second', 'art/s'), ('latency_p50', 'p50'),
+                           ('latency_p99', 'p99'), ('peak_rss_mb', 'RSS')):
+            if before.get(key) and after.get(key) is not None:
+                parts.append(f"{label} {before[key]:.2f} -> {after[key]:.2f} ({after[key] / before[key] - 1:+.0%})")
+        print(f"{run['feeds']:>6} feeds: " + ', '.join(parts))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000], help='numbers of feeds')
+    parser.add_argument('--entries-per-feed', type=int, default=5)
+    parser.add_argument('--cycles', type=int, default=2, help='cycles per size; later ones hit the caches')
+    parser.add_argument('--ollama-latency', type=float, default=0.05, help='seconds before the first chunk')
+    parser.add_argument('--ollama-chunk-delay', type=float, default=0.002, help='seconds between chunks')
+    parser.add_argument('--translate-latency', type=float, default=0.02, help='seconds per translate request')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='results file (default benchmarks/results/pipeline-<revision>.json)')
+    parser.add_argument('--compare', help='earlier results file to compare against')
+    parser.add_argument('--keep', action='store_true', help='keep the working directory with logs')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.cycles, args.translate_latency)
+        return
+
+    with open(os.path.join(ROOT, 'config.yaml')) as f:
+        base_config = yaml.safe_load(f)
+    categories_file = os.path.join(ROOT, base_config['ollama']['categories_file'])
+    with open(categories_file) as f:
+        categories = list(dict.fromkeys(yaml.safe_load(f)['categories']))
+
+    workdir = tempfile.mkdtemp(prefix='bench_pipeline_')
+    feed_dir = os.path.join(workdir, 'feeds')
+    stubs.make_feed_files(feed_dir, max(args.sizes), args.entries_per_feed, args.seed)
+    ollama = stubs.ollama_app(categories, args.ollama_latency, args.ollama_chunk_delay)
+    (feed_port, ollama_port), _ = stubs.serve_in_thread([stubs.feed_app(feed_dir), ollama])
+
+    results = {
+        'revision': revision(),
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'settings': {key: value for key, value in vars(args).items()
+                     if key not in ('output', 'compare', 'keep', 'child')},
+        'runs': []
+    }
+    try:
+        for feeds in args.sizes:
+            print(f"Running {feeds} feeds...", flush=True)
+            results['runs'].append(run_size(
+                args, workdir, feeds, f'http://127.0.0.1:{feed_port}', f'http://127.0.0.1:{ollama_port}',
+                categories_file, base_config, ollama['stats']
+            ))
+    finally:
+        if args.keep:
+            print(f"Working directory kept at {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    output = args.output or os.path.join(BENCH_DIR, 'results', f"pipeline-{results['revision']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+
+    print_results(results)
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(json.load(f), results)
+    print(f"\nResults saved to {output}")
+
+if __name__ == "__main__":
+    main()
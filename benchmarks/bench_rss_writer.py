@@ -0,0 +1,101 @@
+"""Compare rss_writer with feedgen on one large category feed.
+
+Usage: python benchmarks/bench_rss_writer.py [--entries 10000] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytz
+from feedgen.feed import FeedGenerator
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import rss_writer
+
+def make_articles(count):
+    """Synthetic article rows shaped like the feed columns in Supabase"""
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    articles = []
+    for i in range(count):
+        created = start + timedelta(minutes=i)
+        articles.append({
+            'ai_category': 'Poland',
+            'ai_title': f'Article {i}: Sejm & Senate agree on <budget> changes',
+            'ai_summary': 'A long summary of the article. ' * 12,
+            'link': f'https://example.com/news/{i}?a=1&b=2',
+            # Mix both date paths the generator has to handle
+            'published': created.strftime('%a, %d %b %Y %H:%M:%S %z') if i % 2 else '',
+            'created_at': created.isoformat()
+        })
+    return articles
+
+def build_with_feedgen(articles):
+    """The per-category code path b.py used before rss_writer"""
+    fg = FeedGenerator()
+    fg.title('News - Poland')
+    fg.description('News articles related to Poland')
+    fg.link(href='https://example.com/rss-feeds/poland.xml')
+    fg.language('en')
+    for article in articles:
+        fe = fg.add_entry(order='append')
+        fe.title(article.get('ai_title', 'No Title'))
+        fe.description(article.get('ai_summary', 'No Summary'))
+        fe.link(href=article.get('link', '#'))
+        try:
+            pub_date = datetime.strptime(article.get('published', ''), '%a, %d %b %Y %H:%M:%S %z')
+        except ValueError:
+            try:
+                pub_date = datetime.fromisoformat(article.get('created_at', '').replace('Z', '+00:00'))
+            except ValueError:
+                pub_date = datetime.now(pytz.UTC)
+        fe.published(pub_date)
+    return fg.rss_str(pretty=True)
+
+def build_with_rss_writer(articles):
+    return rss_writer.build_feed(
+        title='News - Poland',
+        link='https://example.com/rss-feeds/poland.xml',
+        description='News articles related to Poland',
+        entries=articles
+    )
+
+def best_of(function, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--entries', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    articles = make_articles(args.entries)
+
+    feedgen_time, feedgen_xml = best_of(lambda: build_with_feedgen(articles), args.repeat)
+
+    # The first rss_writer run parses dates; later runs hit the date cache
+    rss_writer.format_pub_date.cache_clear()
+    cold_time, writer_xml = best_of(lambda: build_with_rss_writer(articles), 1)
+    warm_time, writer_xml = best_of(lambda: build_with_rss_writer(articles), args.repeat)
+    gzip_time, compressed = best_of(lambda: rss_writer.compress(writer_xml), args.repeat)
+
+    print(f"{args.entries} entries, best of {args.repeat}")
+    print(f"{'variant':<28}{'seconds':>10}{'speedup':>10}{'bytes':>12}")
+    rows = [
+        ('feedgen (pretty)', feedgen_time, len(feedgen_xml)),
+        ('rss_writer (cold dates)', cold_time, len(writer_xml)),
+        ('rss_writer (cached dates)', warm_time, len(writer_xml)),
+        ('gzip of rss_writer output', gzip_time, len(compressed)),
+    ]
+    for name, seconds, size in rows:
+        print(f"{name:<28}{seconds:>10.4f}{feedgen_time / seconds:>9.1f}x{size:>12}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,397 @@
+"""Local stand-ins for the services the pipeline talks to, for offline benchmarks.
+
+- make_feed_files: fixture RSS feeds, generated deterministically from a seed
+- serve_in_thread: runs aiohttp apps (feed files, stub Ollama) on a background loop
+- ollama_app: streams NDJSON like /api/generate, with configurable latency
+- FakeTranslator: drop-in for deep_translator.GoogleTranslator
+- PostgrestStandIn: the slice of PostgREST and Supabase storage a.py and b.py use
+"""
+import asyncio
+import itertools
+import json
+import os
+import random
+import re
+import threading
+import time
+import zlib
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, unquote, urlsplit
+from xml.sax.saxutils import escape
+
+from aiohttp import web
+
+# Polish-looking vocabulary, with diacritics so the translator is not skipped
+WORDS = """
+rząd sejm senat ustawa budżet minister prezydent premier wybory partia posłowie
+gospodarka inflacja złoty podatek emerytury szkoła szpital lekarze wojsko granica
+ukraina rosja unia europejska niemcy warszawa kraków gdańsk wrocław poznań łódź
+pogoda burze upał mróz pociągi drogi autostrada lotnisko policja sąd prokuratura
+energia węgiel atom wiatraki ceny paliwa mieszkania kredyty banki giełda firmy
+rolnicy zboże mleko eksport import wzrost spadek decyzja projekt zmiany reforma
+protest związkowcy nauczyciele studenci uczelnia badania kultura film festiwal
+mecz reprezentacja piłka trener medal olimpiada kościół biskup papież rocznica
+""".split()
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+def make_feed_files(directory: str, feeds: int, entries_per_feed: int, seed: int = 0) -> List[str]:
+    """Write RSS 2.0 fixture feeds; returns their file names"""
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random(seed)
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    names = []
+    for feed in range(feeds):
+        items = []
+        for entry in range(entries_per_feed):
+            published = start + timedelta(minutes=feed * entries_per_feed + entry)
+            description = ''.join(
+                f"<p>{escape(_sentence(rng, rng.randint(12, 30)))}</p>"
+                for _ in range(rng.randint(1, 4))
+            )
+            if entry % 3 == 0:
+                description = f'<img src="https://img.example.pl/{feed}/{entry}.jpg" alt=""/>' + description
+            items.append(
+                "<item>"
+                f"<title>{escape(_sentence(rng, rng.randint(6, 12)))}</title>"
+                f"<link>https://news{feed % 50}.example.pl/artykul/{feed}-{entry}</link>"
+                f"<description>{escape(description)}</description>"
+                f"<pubDate>{format_datetime(published)}</pubDate>"
+                "</item>"
+            )
+        name = f"feed{feed}.xml"
+        with open(os.path.join(directory, name), 'w', encoding='utf-8') as f:
+            f.write(
+                '<?xml version="1.0" encoding="UTF-8"?>'
+                '<rss version="2.0"><channel>'
+                f'<title>Feed {feed}</title><link>https://news{feed % 50}.example.pl/</link>'
+                '<description>Fixture feed</description>'
+                + ''.join(items)
+                + '</channel></rss>'
+            )
+        names.append(name)
+    return names
+
+def feed_app(directory: str) -> web.Application:
+    """Static feed files; aiohttp answers conditional requests with 304"""
+    app = web.Application()
+    app.router.add_static('/feeds/', directory)
+    return app
+
+def ollama_app(categories: List[str], latency: float, chunk_delay: float,
+               chunk_chars: int = 16) -> web.Application:
+    """Streaming stand-in for Ollama's /api/generate.
+
+    Waits ``latency`` seconds before the first chunk and ``chunk_delay``
+    between chunks. The category is picked from the schema's enum (or the
+    configured list in text mode) by a hash of the prompt, so it is stable.
+    """
+    stats = {'generations': 0, 'warm_ups': 0, 'disconnects': 0}
+
+    async def generate(request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        if 'prompt' not in body:
+            stats['warm_ups'] += 1
+            return web.json_response({'model': body.get('model'), 'done': True})
+        prompt = body['prompt']
+        stats['generations'] += 1
+        content = prompt.rsplit('Article content:', 1)[-1].split()
+        title = ' '.join(content[:10])
+        summary = ' '.join(content[:80])
+        response_format = body.get('format')
+        if isinstance(response_format, dict):
+            properties = response_format.get('properties', {})
+            fields = {'title': title, 'summary': summary}
+            if 'category' in properties:
+                choices = properties['category'].get('enum') or categories
+                fields['category'] = choices[zlib.crc32(prompt.encode('utf-8')) % len(choices)]
+            text = json.dumps(fields, ensure_ascii=False)
+        else:
+            text = f"TITLE: {title}\nSUMMARY: {summary}\n"
+            if 'CATEGORY:' in prompt:
+                text += f"CATEGORY: {categories[zlib.crc32(prompt.encode('utf-8')) % len(categories)]}\n"
+
+        response = web.StreamResponse(headers={'Content-Type': 'application/x-ndjson'})
+        await response.prepare(request)
+        await asyncio.sleep(latency)
+        try:
+            for start in range(0, len(text), chunk_chars):
+                chunk = {'model': body.get('model'), 'response': text[start:start + chunk_chars], 'done': False}
+                await response.write((json.dumps(chunk) + '\n').encode('utf-8'))
+                if chunk_delay:
+                    await asyncio.sleep(chunk_delay)
+            await response.write((json.dumps({'response': '', 'done': True}) + '\n').encode('utf-8'))
+        except ConnectionError:
+            # The client stopped reading once it had every field
+            stats['disconnects'] += 1
+        return response
+
+    app = web.Application()
+    app['stats'] = stats
+    app.router.add_post('/api/generate', generate)
+    return app
+
+def serve_in_thread(apps: List[web.Application]) -> Tuple[List[int], asyncio.AbstractEventLoop]:
+    """Serve each app on a free localhost port from a daemon thread; returns the ports"""
+    loop = asyncio.new_event_loop()
+    ports: List[int] = []
+    ready = threading.Event()
+
+    async def start():
+        for app in apps:
+            runner = web.AppRunner(app, access_log=None)
+            await runner.setup()
+            site = web.TCPSite(runner, '127.0.0.1', 0)
+            await site.start()
+            ports.append(site._server.sockets[0].getsockname()[1])
+        ready.set()
+
+    def run():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(start())
+        loop.run_forever()
+
+    threading.Thread(target=run, daemon=True).start()
+    ready.wait()
+    return ports, loop
+
+class FakeTranslator:
+    """Replaces GoogleTranslator: returns the text as is after ``latency`` seconds"""
+    latency = 0.0
+    calls = 0
+
+    def __init__(self, source: str = 'auto', target: str = 'en', **kwargs):
+        self.source = source
+        self.target = target
+
+    def translate(self, text: str) -> str:
+        FakeTranslator.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return text
+
+# PostgREST stand-in
+
+def _split_top(text: str, sep: str = ',') -> List[str]:
+    """Split on sep outside parentheses and double quotes"""
+    parts, depth, current, quoted = [], 0, '', False
+    for char in text:
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == '(':
+            depth += 1
+        elif not quoted and char == ')':
+            depth -= 1
+        if char == sep and depth == 0 and not quoted:
+            parts.append(current)
+            current = ''
+        else:
+            current += char
+    parts.append(current)
+    return parts
+
+def _unquote(value: str) -> str:
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return value[1:-1].replace('\\"', '"').replace('\\\\', '\\')
+    return value
+
+def _matches(row: Dict[str, Any], column: str, op: str, value: str) -> bool:
+    current = row.get(column)
+    if op == 'in':
+        return current is not None and str(current) in {_unquote(v) for v in _split_top(value.strip('()'))}
+    if op == 'is':
+        return current is None if value == 'null' else str(current).lower() == value
+    if current is None:
+        return False
+    value = _unquote(value)
+    if isinstance(current, (int, float)) and not isinstance(current, bool):
+        try:
+            value = type(current)(value)
+        except ValueError:
+            pass
+    return {
+        'eq': lambda: current == value, 'neq': lambda: current != value,
+        'gt': lambda: current > value, 'gte': lambda: current >= value,
+        'lt': lambda: current < value, 'lte': lambda: current <= value
+    }[op]()
+
+def _logic(row: Dict[str, Any], kind: str, body: str) -> bool:
+    results = []
+    for part in _split_top(body[1:-1]):
+        nested = re.match(r'^(and|or)(\(.*\))$', part)
+        if nested:
+            results.append(_logic(row, nested.group(1), nested.group(2)))
+        else:
+            column, op, value = part.split('.', 2)
+            results.append(_matches(row, column, op, value))
+    return all(results) if kind == 'and' else any(results)
+
+_RESERVED = {'select', 'order', 'limit', 'offset', 'on_conflict', 'columns'}
+
+class PostgrestStandIn:
+    """In-memory tables and storage objects behind a threaded HTTP server.
+
+    Supports the filters, ordering, paging, upserts, deletes and storage
+    uploads the application issues; point SUPABASE_URL at ``url``.
+    """
+
+    def __init__(self, unique: Optional[Dict[str, str]] = None):
+        self.tables: Dict[str, List[Dict[str, Any]]] = {}
+        self.objects: Dict[Tuple[str, str], bytes] = {}
+        # Columns with a unique constraint, per table
+        self.unique = unique or {'articles': 'link'}
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _filter(self, rows, params):
+        for key, value in params:
+            if key in _RESERVED:
+                continue
+            if key in ('or', 'and'):
+                rows = [row for row in rows if _logic(row, key, value)]
+                continue
+            op, value = value.split('.', 1)
+            negate = op == 'not'
+            if negate:
+                op, value = value.split('.', 1)
+            rows = [row for row in rows if _matches(row, key, op, value) != negate]
+        return rows
+
+    def rest(self, method: str, table: str, params, prefer: str, body: bytes):
+        self.requests += 1
+        options = dict(params)
+        with self.lock:
+            rows = self.tables.setdefault(table, [])
+            if method in ('GET', 'HEAD'):
+                selected = self._filter(rows, params)
+                for part in reversed(options.get('order', '').split(',') if 'order' in options else []):
+                    column, *flags = part.split('.')
+                    present = [row for row in selected if row.get(column) is not None]
+                    missing = [row for row in selected if row.get(column) is None]
+                    present.sort(key=lambda row: row[column], reverse='desc' in flags)
+                    selected = present + missing
+                total = len(selected)
+                offset = int(options.get('offset', 0))
+                selected = selected[offset:]
+                if 'limit' in options:
+                    selected = selected[:int(options['limit'])]
+                if options.get('select', '*') != '*':
+                    columns = [column.strip() for column in options['select'].split(',')]
+                    selected = [{column: row.get(column) for column in columns} for row in selected]
+                headers = {}
+                if 'count=exact' in prefer:
+                    end = offset + len(selected) - 1
+                    headers['Content-Range'] = f"{offset}-{end}/{total}" if selected else f"*/{total}"
+                return 200, selected, headers
+            if method == 'POST':
+                items = json.loads(body or b'[]')
+                items = items if isinstance(items, list) else [items]
+                conflict = options.get('on_conflict') or self.unique.get(table)
+                index = {row.get(conflict): row for row in rows} if conflict else {}
+                upsert = 'resolution=merge-duplicates' in prefer or 'on_conflict' in options
+                written = []
+                for item in items:
+                    existing = index.get(item.get(conflict)) if conflict else None
+                    if existing is not None:
+                        if not upsert:
+                            return 409, {'code': '23505', 'message': 'duplicate key value violates unique constraint'}, {}
+                        existing.update(item)
+                        written.append(existing)
+                        continue
+                    row = {'id': next(self.ids), 'created_at': datetime.now(timezone.utc).isoformat(), **item}
+                    rows.append(row)
+                    if conflict:
+                        index[row.get(conflict)] = row
+                    written.append(row)
+                return 201, None if 'return=minimal' in prefer else written, {}
+            if method in ('PATCH', 'DELETE'):
+                matched = self._filter(rows, params)
+                if method == 'PATCH':
+                    changes = json.loads(body or b'{}')
+                    for row in matched:
+                        row.update(changes)
+                else:
+                    gone = {id(row) for row in matched}
+                    self.tables[table] = [row for row in rows if id(row) not in gone]
+                return 200, None if 'return=minimal' in prefer else matched, {}
+        return 405, None, {}
+
+    def storage(self, method: str, path: str, headers, body: bytes):
+        self.requests += 1
+        match = re.match(r'^/storage/v1/object/(?:public/)?([^/]+)/?(.*)$', path)
+        if not match:
+            return 404, None, {}
+        bucket, name = match.group(1), unquote(match.group(2))
+        if method in ('POST', 'PUT'):
+            content_type = headers.get('Content-Type', '')
+            if 'multipart/form-data' in content_type:
+                boundary = content_type.split('boundary=')[1].encode()
+                for part in body.split(b'--' + boundary):
+                    if b'name="file"' in part:
+                        body = part.split(b'\r\n\r\n', 1)[1].rsplit(b'\r\n', 1)[0]
+            with self.lock:
+                if method == 'POST' and (bucket, name) in self.objects and headers.get('x-upsert') != 'true':
+                    return 400, {'statusCode': '409', 'error': 'Duplicate', 'message': 'The resource already exists'}, {}
+                self.objects[(bucket, name)] = body
+            return 200, {'Key': f'{bucket}/{name}'}, {}
+        if method == 'GET':
+            data = self.objects.get((bucket, name))
+            return (200, data, {}) if data is not None else (404, None, {})
+        if method == 'DELETE':
+            for prefix in json.loads(body or b'{}').get('prefixes', []):
+                self.objects.pop((bucket, prefix), None)
+            return 200, [], {}
+        return 405, None, {}
+
+    def _handler(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def _dispatch(self):
+                parts = urlsplit(self.path)
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else b''
+                if parts.path.startswith('/rest/v1/'):
+                    status, payload, headers = stand_in.rest(
+                        self.command, parts.path[len('/rest/v1/'):],
+                        parse_qsl(parts.query, keep_blank_values=True),
+                        self.headers.get('Prefer', ''), body
+                    )
+                elif parts.path.startswith('/storage/v1/object/'):
+                    status, payload, headers = stand_in.storage(self.command, parts.path, self.headers, body)
+                else:
+                    status, payload, headers = 404, None, {}
+                if isinstance(payload, bytes):
+                    data = payload
+                else:
+                    data = b'' if payload is None else json.dumps(payload).encode('utf-8')
+                    headers['Content-Type'] = 'application/json'
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                if self.command != 'HEAD':
+                    self.wfile.write(data)
+
+            do_GET = do_HEAD = do_POST = do_PUT = do_PATCH = do_DELETE = _dispatch
+
+        return Handler
@@ -0,0 +1,345 @@
+import argparse
+import math
+import os
+import re
+import sqlite3
+import threading
+import zlib
+from collections import defaultdict
+from datetime import timedelta
+from typing import Any, Collection, Dict, Iterable, List, Optional, Tuple
+from dateutil import parser
+
+_WORD = re.compile(r'[^\W\d_]{2,}')
+
+def features(text: str, n_features: int) -> set:
+    """Hashed word unigram and bigram features of a text"""
+    words = _WORD.findall(text.lower())
+    tokens = words + [f'{a} {b}' for a, b in zip(words, words[1:])]
+    # crc32 rather than hash(): feature ids must be stable across processes
+    return {zlib.crc32(token.encode('utf-8')) % n_features for token in tokens}
+
+class CategoryClassifier:
+    """Incremental naive Bayes classifier over hashed text features.
+
+    Learns from the categories the LLM assigned to stored articles and
+    predicts a category with a posterior probability, so confident cases
+    can skip the category part of the LLM call. Counts live in SQLite and
+    are kept in step with Supabase using a created_at watermark. Articles
+    the classifier labelled itself are remembered locally and never used
+    for training, so it doesn't learn from its own guesses. Articles
+    learned from are remembered while they are inside the sync overlap,
+    so re-reading them doesn't count them twice. Worker processes on a
+    host share the SQLite file: counts are added to, never overwritten,
+    and a sync reloads them when another process has changed them.
+    """
+
+    def __init__(self, config: Dict[str, Any], path: Optional[str] = None):
+        self.n_features = config['n_features']
+        self.alpha = config['alpha']
+        self.threshold = config['threshold']
+        self.min_examples = config['min_examples']
+        self.lock = threading.Lock()
+
+        path = path or config['model_file']
+        model_dir = os.path.dirname(path)
+        if model_dir:
+            os.makedirs(model_dir, exist_ok=True)
+        # Syncs run in a worker thread; self.lock guards the counts and connection
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS class_counts (
+                category TEXT PRIMARY KEY,
+                docs INTEGER NOT NULL,
+                features INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS feature_counts (
+                category TEXT NOT NULL,
+                feature INTEGER NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (category, feature)
+            );
+            CREATE TABLE IF NOT EXISTS predicted (
+                link TEXT PRIMARY KEY
+            );
+            CREATE TABLE IF NOT EXISTS learned (
+                link TEXT PRIMARY KEY,
+                created_at TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+        """)
+        self._load()
+        self.reset_stats()
+
+    def _load(self):
+        """Read the counts from SQLite; the caller holds self.lock or is __init__"""
+        self.docs: Dict[str, int] = {}
+        self.totals: Dict[str, int] = {}
+        self.counts: Dict[str, Dict[int, int]] = defaultdict(dict)
+        for category, docs, total in self.conn.execute('SELECT * FROM class_counts'):
+            self.docs[category] = docs
+            self.totals[category] = total
+        for category, feature, count in self.conn.execute('SELECT * FROM feature_counts'):
+            self.counts[category][feature] = count
+        # Changes when another connection commits to the file
+        self.data_version = self.conn.execute('PRAGMA data_version').fetchone()[0]
+
+    def reload_if_changed(self) -> bool:
+        """Reload the counts if another process has changed them since the last load"""
+        with self.lock:
+            if self.conn.execute('PRAGMA data_version').fetchone()[0] == self.data_version:
+                return False
+            self._load()
+            return True
+
+    def reset_stats(self):
+        """Start a new per-cycle tally"""
+        self.stats = {'predicted': 0, 'deferred': 0, 'learned': 0}
+
+    @property
+    def examples(self) -> int:
+        return sum(self.docs.values())
+
+    def learn_many(self, examples: Iterable[Tuple[str, str]]):
+        """Update the counts with (text, category) pairs"""
+        with self.lock:
+            self._learn(examples)
+
+    def _learn(self, examples: Iterable[Tuple[str, str]]):
+        # The caller holds self.lock; commits the transaction it may have opened
+        docs = defaultdict(int)
+        totals = defaultdict(int)
+        added = defaultdict(int)
+        for text, category in examples:
+            observed = features(text, self.n_features)
+            docs[category] += 1
+            totals[category] += len(observed)
+            counts = self.counts[category]
+            for feature in observed:
+                counts[feature] = counts.get(feature, 0) + 1
+                added[(category, feature)] += 1
+        for category, count in docs.items():
+            self.docs[category] = self.docs.get(category, 0) + count
+            self.totals[category] = self.totals.get(category, 0) + totals[category]
+        # Increments, like feature_counts: other processes add to the same rows
+        self.conn.executemany("""
+            INSERT INTO class_counts VALUES (?, ?, ?)
+            ON CONFLICT(category) DO UPDATE SET
+                docs = docs + excluded.docs,
+                features = features + excluded.features
+        """, [(category, count, totals[category]) for category, count in docs.items()])
+        self.conn.executemany("""
+            INSERT INTO feature_counts VALUES (?, ?, ?)
+            ON CONFLICT(category, feature) DO UPDATE SET count = count + excluded.count
+        """, [(category, feature, n) for (category, feature), n in added.items()])
+        self.conn.commit()
+        self.stats['learned'] += sum(docs.values())
+
+    def probabilities(self, text: str) -> Dict[str, float]:
+        """Posterior probability of each known category"""
+        observed = features(text, self.n_features)
+        with self.lock:
+            total_docs = sum(self.docs.values())
+            scores = {}
+            for category, docs in self.docs.items():
+                counts = self.counts[category]
+                denominator = math.log(self.totals[category] + self.alpha * self.n_features)
+                score = math.log(docs / total_docs)
+                for feature in observed:
+                    score += math.log(counts.get(feature, 0) + self.alpha) - denominator
+                scores[category] = score
+        if not scores:
+            return {}
+        best = max(scores.values())
+        exps = {category: math.exp(score - best) for category, score in scores.items()}
+        norm = sum(exps.values())
+        return {category: value / norm for category, value in exps.items()}
+
+    def predict(self, text: str) -> Tuple[Optional[str], float]:
+        """Most likely category and its probability; (None, 0.0) while untrained"""
+        if self.examples < self.min_examples:
+            return None, 0.0
+        probabilities = self.probabilities(text)
+        if not probabilities:
+            return None, 0.0
+        category = max(probabilities, key=probabilities.get)
+        return category, probabilities[category]
+
+    def classify(self, text: str, valid_categories: Collection[str]) -> Optional[str]:
+        """Category if the prediction is confident and valid, else None"""
+        category, confidence = self.predict(text)
+        if category in valid_categories and confidence >= self.threshold:
+            self.stats['predicted'] += 1
+            return category
+        self.stats['deferred'] += 1
+        return None
+
+    def mark_predicted(self, link: str):
+        """Remember an article sync() must not learn from, e.g. one the classifier labelled"""
+        with self.lock:
+            self.conn.execute('INSERT OR IGNORE INTO predicted VALUES (?)', (link,))
+            self.conn.commit()
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        with self.lock:
+            row = self.conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str):
+        with self.lock:
+            self.conn.execute('INSERT OR REPLACE INTO meta VALUES (?, ?)', (key, value))
+            self.conn.commit()
+
+    def sync(self, supabase, page_size: int, overlap: float = 0) -> int:
+        """Learn from articles labelled since the last sync; returns the number learned.
+
+        Reading restarts ``overlap`` seconds before the watermark, for rows
+        committed after later ones (e.g. by another worker's slower upsert).
+        """
+        watermark = self._get_meta('created_at_watermark')
+        since = watermark
+        if watermark and overlap:
+            since = (parser.isoparse(watermark) - timedelta(seconds=overlap)).isoformat()
+        start = since
+        learned = 0
+        while True:
+            query = supabase.table('articles')\
+                .select('link, original_title, original_description, ai_category, created_at')\
+                .not_.is_('ai_category', 'null')\
+                .order('created_at')\
+                .limit(page_size)
+            if since:
+                # gte, not gt: rows sharing the boundary timestamp may span pages
+                query = query.gte('created_at', since)
+            rows = query.execute().data
+            if not rows:
+                break
+
+            links = [row['link'] for row in rows]
+            placeholders = ','.join('?' * len(links))
+            with self.lock:
+                # Labelled by the classifier, or already learned from
+                skip = {
+                    link for (link,) in self.conn.execute(
+                        f'SELECT link FROM predicted WHERE link IN ({placeholders}) '
+                        f'UNION SELECT link FROM learned WHERE link IN ({placeholders})', links + links
+                    )
+                }
+                # Claimed in the same transaction as the counts, so a worker
+                # syncing concurrently can't learn the same row
+                new_rows = [
+                    row for row in rows if row['link'] not in skip and self.conn.execute(
+                        'INSERT OR IGNORE INTO learned VALUES (?, ?)', (row['link'], row['created_at'])
+                    ).rowcount
+                ]
+                self._learn((article_text(row), row['ai_category']) for row in new_rows)
+            learned += len(new_rows)
+
+            last = rows[-1]['created_at']
+            if last == since and len(rows) == page_size:
+                # A whole page shares the boundary timestamp; stop here
+                break
+            since = last
+            if watermark is None or last > watermark:
+                watermark = last
+                self._set_meta('created_at_watermark', watermark)
+            if len(rows) < page_size:
+                break
+
+        if start:
+            # Rows before this sync's start are never read again
+            with self.lock:
+                self.conn.execute('DELETE FROM learned WHERE created_at < ?', (start,))
+                self.conn.commit()
+        # Pick up what other workers learned
+        self.reload_if_changed()
+        return learned
+
+    def summary(self) -> str:
+        """One-line description of this cycle's predictions"""
+        decided = self.stats['predicted'] + self.stats['deferred']
+        share = self.stats['predicted'] / decided if decided else 0.0
+        return (
+            f"{self.stats['predicted']} categorized locally, {self.stats['deferred']} sent to the LLM "
+            f"({share:.0%} local), {self.stats['learned']} examples learned, "
+            f"{self.examples} total across {len(self.docs)} categories"
+        )
+
+    def close(self):
+        self.conn.close()
+
+def article_text(article: Dict[str, Any]) -> str:
+    """Text the classifier sees: translated title and description"""
+    return f"{article.get('original_title') or ''}\n{article.get('original_description') or ''}"
+
+def load_labelled(supabase, page_size: int, limit: int) -> List[Dict[str, Any]]:
+    """Newest LLM-labelled articles, oldest first"""
+    rows = []
+    while len(rows) < limit:
+        query = supabase.table('articles')\
+            .select('original_title, original_description, ai_category, created_at')\
+            .not_.is_('ai_category', 'null')\
+            .order('created_at', desc=True)\
+            .limit(min(page_size, limit - len(rows)))
+        if rows:
+            query = query.lt('created_at', rows[-1]['created_at'])
+        page = query.execute().data
+        rows.extend(page)
+        if len(page) < page_size:
+            break
+    return rows[::-1]
+
+def evaluate(config: Dict[str, Any], rows: List[Dict[str, Any]], test_fraction: float,
+             thresholds: List[float]):
+    """Train on older rows, test on the newest, and print agreement per threshold"""
+    split = int(len(rows) * (1 - test_fraction))
+    train, test = rows[:split], rows[split:]
+    model = CategoryClassifier(config, path=':memory:')
+    model.learn_many((article_text(row), row['ai_category']) for row in train)
+
+    predictions = [(model.predict(article_text(row)), row['ai_category']) for row in test]
+    print(f"Trained on {len(train)} articles, tested on {len(test)} newer ones")
+    print(f"{'threshold':>10}{'confident':>12}{'agreement':>12}{'overall':>10}")
+    for threshold in thresholds:
+        confident = [(category, label) for (category, p), label in predictions if p >= threshold]
+        agree = sum(category == label for category, label in confident)
+        overall = agree + sum(
+            category == label for (category, p), label in predictions if p < threshold
+        )
+        print(
+            f"{threshold:>10.2f}"
+            f"{len(confident) / max(len(test), 1):>12.1%}"
+            f"{agree / max(len(confident), 1):>12.1%}"
+            f"{overall / max(len(test), 1):>10.1%}"
+        )
+    print("confident: share categorized locally (LLM calls saved in category_only mode)")
+    print("agreement: share of those where the classifier matches the LLM label")
+    print("overall:   accuracy if every article were labelled by the classifier")
+
+def main():
+    """Offline evaluation against LLM labels stored in Supabase"""
+    import yaml
+    from dotenv import load_dotenv
+    from supabase import create_client
+
+    parser = argparse.ArgumentParser(description="Evaluate the local category classifier")
+    subcommands = parser.add_subparsers(dest='command', required=True)
+    evaluate_parser = subcommands.add_parser('evaluate', help="agreement with stored LLM labels")
+    evaluate_parser.add_argument('--limit', type=int, default=20000, help="newest articles to use")
+    evaluate_parser.add_argument('--test-fraction', type=float, default=0.2)
+    evaluate_parser.add_argument('--thresholds', type=float, nargs='+', default=[0.5, 0.7, 0.8, 0.9, 0.95, 0.99])
+    args = parser.parse_args()
+
+    load_dotenv()
+    with open('config.yaml', 'r') as f:
+        config = yaml.safe_load(f)
+    supabase = create_client(os.getenv('SUPABASE_URL'), os.getenv('SUPABASE_KEY'))
+    rows = load_labelled(supabase, config['classifier']['sync_page_size'], args.limit)
+    evaluate(config['classifier'], rows, args.test_fraction, args.thresholds)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+import hashlib
+import math
+import os
+import sqlite3
+import threading
+import time
+from datetime import timedelta
+from typing import Iterable, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from dateutil import parser
+
+# Query parameters that only carry tracking information
+TRACKING_PARAMS = frozenset({
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid',
+    'mc_cid', 'mc_eid', '_ga', 'ocid', 'cmpid', 'at_medium', 'at_campaign'
+})
+TRACKING_PREFIXES = ('utm_',)
+
+def normalize_link(url: str) -> str:
+    """Canonical form of an article URL used for deduplication.
+
+    Drops tracking parameters, fragments, default ports, a leading "www."
+    and trailing slashes, treats http and https as the same and sorts the
+    remaining query parameters.
+    """
+    url = (url or '').strip()
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        # Malformed link, e.g. a non-numeric port or an unclosed IPv6 bracket
+        return url
+    if parts.scheme not in ('http', 'https'):
+        return url
+
+    host = (parts.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if port and port not in (80, 443):
+        host = f"{host}:{port}"
+
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    )
+    path = parts.path.rstrip('/')
+    return urlunsplit(('https', host, path, urlencode(query), ''))
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings"""
+
+    def __init__(self, expected_items: int, false_positive_rate: float):
+        self.size = max(8, int(-expected_items * math.log(false_positive_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / expected_items * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.hashes):
+            yield (first + i * second) % self.size
+
+    def add(self, item: str):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+class DedupIndex:
+    """Local index of already stored article links.
+
+    Links live in SQLite and are mirrored in an in-memory Bloom filter, so
+    the common "not seen yet" answer needs no disk access. The index is
+    kept in step with Supabase incrementally using a created_at watermark.
+    Worker processes on a host share the SQLite file; each sync also adds
+    links other processes stored to this process's Bloom filter.
+    """
+
+    def __init__(self, path: str, expected_items: int, false_positive_rate: float):
+        index_dir = os.path.dirname(path)
+        if index_dir:
+            os.makedirs(index_dir, exist_ok=True)
+        self.lock = threading.Lock()
+        # Syncs run in a worker thread; self.lock guards the connection and Bloom filter
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS links (
+                link TEXT PRIMARY KEY,
+                added_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+        """)
+        self.bloom = BloomFilter(expected_items, false_positive_rate)
+        # Highest rowid already in the Bloom filter
+        self.loaded_rowid = 0
+        self.refresh()
+
+    def __contains__(self, link: str) -> bool:
+        link = normalize_link(link)
+        with self.lock:
+            if link not in self.bloom:
+                return False
+            return self.conn.execute('SELECT 1 FROM links WHERE link = ?', (link,)).fetchone() is not None
+
+    def add_many(self, links: Iterable[str]):
+        """Record links of stored articles"""
+        now = time.time()
+        rows = [(normalize_link(link), now) for link in links if link]
+        with self.lock:
+            self.conn.executemany('INSERT OR IGNORE INTO links VALUES (?, ?)', rows)
+            self.conn.commit()
+            for link, _ in rows:
+                self.bloom.add(link)
+
+    def add(self, link: str):
+        self.add_many([link])
+
+    def refresh(self) -> int:
+        """Add links stored since the last refresh, by any process, to the Bloom filter"""
+        with self.lock:
+            rows = self.conn.execute(
+                'SELECT rowid, link FROM links WHERE rowid > ? ORDER BY rowid', (self.loaded_rowid,)
+            ).fetchall()
+            for _, link in rows:
+                self.bloom.add(link)
+            if rows:
+                self.loaded_rowid = rows[-1][0]
+        return len(rows)
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        with self.lock:
+            row = self.conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str):
+        with self.lock:
+            self.conn.execute('INSERT OR REPLACE INTO meta VALUES (?, ?)', (key, value))
+            self.conn.commit()
+
+    def sync(self, supabase, page_size: int, overlap: float = 0) -> int:
+        """Pull links created since the last sync; returns the number of rows read.
+
+        Reading restarts ``overlap`` seconds before the watermark, for rows
+        committed after later ones (e.g. by another worker's slower upsert).
+        """
+        watermark = self._get_meta('created_at_watermark')
+        since = watermark
+        if watermark and overlap:
+            since = (parser.isoparse(watermark) - timedelta(seconds=overlap)).isoformat()
+        total = 0
+        while True:
+            query = supabase.table('articles')\
+                .select('link, created_at')\
+                .order('created_at')\
+                .limit(page_size)
+            if since:
+                # gte, not gt: rows sharing the boundary timestamp may span pages
+                query = query.gte('created_at', since)
+            rows = query.execute().data
+            self.add_many(row['link'] for row in rows)
+            total += len(rows)
+
+            if rows:
+                last = rows[-1]['created_at']
+                if last == since and len(rows) == page_size:
+                    # A whole page shares the boundary timestamp; stop here
+                    break
+                since = last
+                if watermark is None or last > watermark:
+                    watermark = last
+                    self._set_meta('created_at_watermark', watermark)
+            if len(rows) < page_size:
+                break
+        # Links another worker synced or saved are past the shared watermark
+        self.refresh()
+        return total
+
+    def prune(self, max_age_days: int) -> int:
+        """Forget links added more than max_age_days ago"""
+        with self.lock:
+            cursor = self.conn.execute(
+                'DELETE FROM links WHERE added_at < ?',
+                (time.time() - max_age_days * 86400,)
+            )
+            self.conn.commit()
+            return cursor.rowcount
@@ -0,0 +1,126 @@
+import os
+import sqlite3
+import time
+from typing import Any, Dict, Iterable, Optional
+
+class FeedCache:
+    """SQLite store of per-feed HTTP validators and content hashes.
+
+    A new body's validators are only stored once every entry of it that
+    still had to be processed has been saved, so entries lost to a failed
+    stage or a restart are fetched again instead of hidden behind a 304.
+    """
+
+    def __init__(self, path: str):
+        cache_dir = os.path.dirname(path)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS feed_cache (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                content_hash TEXT,
+                size INTEGER,
+                updated_at REAL
+            )
+        """)
+        self.conn.commit()
+        # Feed URL -> (validators, normalized links still to be saved)
+        self.pending: Dict[str, tuple] = {}
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Start a new per-cycle hit/miss tally"""
+        self.stats = {
+            'not_modified': 0,
+            'unchanged': 0,
+            'misses': 0,
+            'bytes_downloaded': 0,
+            'bytes_saved': 0
+        }
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """Return the cached entry for a feed, if any"""
+        row = self.conn.execute('SELECT * FROM feed_cache WHERE url = ?', (url,)).fetchone()
+        return dict(row) if row else None
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """Build If-None-Match / If-Modified-Since headers for a feed"""
+        entry = self.get(url)
+        headers = {}
+        if entry:
+            if entry['etag']:
+                headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def record_not_modified(self, url: str):
+        """Count a 304 response"""
+        entry = self.get(url)
+        self.stats['not_modified'] += 1
+        self.stats['bytes_saved'] += (entry or {}).get('size') or 0
+
+    def check(self, url: str, content_hash: str, size: int) -> bool:
+        """Return True if the body is the same as the last stored one"""
+        entry = self.get(url)
+        unchanged = entry is not None and entry['content_hash'] == content_hash
+        self.stats['bytes_downloaded'] += size
+        if unchanged:
+            self.stats['unchanged'] += 1
+            self.stats['bytes_saved'] += size
+        else:
+            self.stats['misses'] += 1
+        return unchanged
+
+    def store(self, url: str, etag: Optional[str], last_modified: Optional[str],
+              content_hash: str, size: int):
+        """Store a body's validators and content hash"""
+        self.conn.execute("""
+            INSERT INTO feed_cache (url, etag, last_modified, content_hash, size, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(url) DO UPDATE SET
+                etag = excluded.etag,
+                last_modified = excluded.last_modified,
+                content_hash = excluded.content_hash,
+                size = excluded.size,
+                updated_at = excluded.updated_at
+        """, (url, etag, last_modified, content_hash, size, time.time()))
+        self.conn.commit()
+
+    def store_when_saved(self, url: str, validators: Dict[str, Any], links: Iterable[str]):
+        """Store validators once all these entry links are saved; at once if there are none"""
+        links = set(links)
+        if links:
+            # Replaces what an earlier body of the feed was waiting for
+            self.pending[url] = (validators, links)
+        else:
+            self.pending.pop(url, None)
+            self.store(url, **validators)
+
+    def mark_saved(self, url: str, link: str):
+        """Note a saved entry of a feed; stores the feed's validators after its last one"""
+        pending = self.pending.get(url)
+        if pending is None:
+            return
+        validators, links = pending
+        links.discard(link)
+        if not links:
+            del self.pending[url]
+            self.store(url, **validators)
+
+    def summary(self) -> str:
+        """One-line description of this cycle's cache effectiveness"""
+        hits = self.stats['not_modified'] + self.stats['unchanged']
+        return (
+            f"{hits} hits ({self.stats['not_modified']} not modified, "
+            f"{self.stats['unchanged']} unchanged), {self.stats['misses']} misses, "
+            f"{self.stats['bytes_downloaded'] / 1024:.0f} KB downloaded, "
+            f"~{self.stats['bytes_saved'] / 1024:.0f} KB skipped"
+        )
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,101 @@
+import asyncio
+import hashlib
+from typing import Any, Dict, NamedTuple, Optional
+import aiohttp
+import feedparser
+from feed_cache import FeedCache
+from logger_config import setup_logger
+from metrics import METRICS
+
+logger = setup_logger('feed_fetcher')
+
+# Shared HTTP session, reused across processing cycles
+_session: Optional[aiohttp.ClientSession] = None
+
+class FetchResult(NamedTuple):
+    url: str
+    feed: Any = None
+    error: Optional[Exception] = None
+    # 'ok', 'not_modified', 'unchanged' or 'error'
+    status: str = 'ok'
+    # Arguments for FeedCache.store once the body's entries are saved
+    validators: Optional[Dict[str, Any]] = None
+
+def get_session(config: Dict[str, Any]) -> aiohttp.ClientSession:
+    """Return the pooled HTTP session, creating it on first use"""
+    global _session
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=config['max_concurrent'],
+            limit_per_host=config['per_host_limit'],
+            ttl_dns_cache=300
+        )
+        timeout = aiohttp.ClientTimeout(
+            total=config['total_timeout'],
+            connect=config['connect_timeout'],
+            sock_read=config['read_timeout']
+        )
+        _session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=timeout,
+            headers={'User-Agent': config['user_agent']}
+        )
+    return _session
+
+async def close_session():
+    """Close the pooled HTTP session"""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+async def fetch_feed(session: aiohttp.ClientSession, url: str,
+                     cache: Optional[FeedCache] = None) -> FetchResult:
+    """Download a feed and parse it in a worker thread.
+
+    With a cache, the request is conditional and feeds that answer 304 or
+    return a body identical to the last one are skipped before parsing.
+    Validators of a new body are returned, not stored: the caller stores
+    them once the body's entries are saved.
+    """
+    request_headers = cache.conditional_headers(url) if cache else {}
+    with METRICS.timer('fetch'):
+        async with session.get(url, headers=request_headers) as response:
+            if response.status == 304 and cache:
+                cache.record_not_modified(url)
+                return FetchResult(url, status='not_modified')
+            response.raise_for_status()
+            body = await response.read()
+            headers = {
+                'content-type': response.headers.get('Content-Type', ''),
+                'content-location': str(response.url)
+            }
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+    METRICS.incr('fetched_bytes', len(body))
+
+    validators = None
+    if cache:
+        validators = {
+            'etag': etag, 'last_modified': last_modified,
+            'content_hash': hashlib.sha256(body).hexdigest(), 'size': len(body)
+        }
+        if cache.check(url, validators['content_hash'], len(body)):
+            # Its entries were all saved before the hash was; refresh the validators
+            cache.store(url, **validators)
+            return FetchResult(url, status='unchanged')
+
+    with METRICS.timer('parse'):
+        feed = await asyncio.to_thread(feedparser.parse, body, response_headers=headers)
+    return FetchResult(url, feed=feed, validators=validators)
+
+async def fetch(url: str, config: Dict[str, Any],
+                cache: Optional[FeedCache] = None) -> FetchResult:
+    """Fetch one feed on the pooled session, capturing any error in the result"""
+    try:
+        return await fetch_feed(get_session(config), url, cache)
+    except Exception as e:
+        if isinstance(e, asyncio.TimeoutError):
+            e = TimeoutError(f"timed out after {config['total_timeout']}s")
+        logger.error(f"Error fetching feed {url}: {str(e)}")
+        return FetchResult(url, error=e, status='error')
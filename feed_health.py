@@ -0,0 +1,200 @@
+import os
+import sqlite3
+import time
+from typing import Any, Dict, List, Optional
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+class FeedHealth:
+    """Per-feed health tracking with a circuit breaker.
+
+    Each feed keeps an exponentially weighted latency and error rate plus a
+    count of consecutive failures. After ``failure_threshold`` failures in a
+    row the breaker opens and the feed is skipped for ``base_backoff``
+    seconds. Once that expires a single probe fetch is let through
+    (half-open): success closes the breaker, failure reopens it with the
+    backoff doubled, up to ``max_backoff``. State is kept in SQLite,
+    shared by the worker processes on a host; ``reload`` picks up feeds
+    other workers updated, e.g. after a lease handover.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        self.failure_threshold = config['failure_threshold']
+        self.base_backoff = config['base_backoff']
+        self.max_backoff = config['max_backoff']
+        self.smoothing = config['smoothing']
+        self.slow_seconds = config['slow_seconds']
+
+        state_dir = os.path.dirname(config['state_file'])
+        if state_dir:
+            os.makedirs(state_dir, exist_ok=True)
+        self.conn = sqlite3.connect(config['state_file'], timeout=30)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS feed_health (
+                url TEXT PRIMARY KEY,
+                state TEXT NOT NULL,
+                consecutive_failures INTEGER NOT NULL,
+                successes INTEGER NOT NULL,
+                failures INTEGER NOT NULL,
+                latency REAL,
+                error_rate REAL NOT NULL,
+                backoff REAL,
+                retry_at REAL,
+                last_error TEXT,
+                updated_at REAL,
+                parse_failed INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        columns = {row['name'] for row in self.conn.execute('PRAGMA table_info(feed_health)')}
+        if 'parse_failed' not in columns:
+            # State files written before the column existed
+            self.conn.execute('ALTER TABLE feed_health ADD COLUMN parse_failed INTEGER NOT NULL DEFAULT 0')
+        self.conn.commit()
+        # Feeds whose half-open probe this process let through
+        self.probing = set()
+        self.reload()
+        self.reset_stats()
+
+    def reload(self):
+        """Read every feed's state from SQLite, replacing the copy in memory"""
+        self.feeds: Dict[str, Dict[str, Any]] = {
+            row['url']: dict(row) for row in self.conn.execute('SELECT * FROM feed_health')
+        }
+        # A probe interrupted by a restart, or by another worker losing the
+        # feed, never reports back; probe again
+        for url, feed in self.feeds.items():
+            if feed['state'] == HALF_OPEN and url not in self.probing:
+                feed['state'] = OPEN
+
+    def reset_stats(self):
+        """Start a new per-cycle tally"""
+        self.stats = {'skipped': 0, 'probes': 0, 'opened': 0, 'recovered': 0}
+
+    def _feed(self, url: str) -> Dict[str, Any]:
+        if url not in self.feeds:
+            self.feeds[url] = {
+                'url': url, 'state': CLOSED, 'consecutive_failures': 0, 'successes': 0,
+                'failures': 0, 'latency': None, 'error_rate': 0.0, 'backoff': None,
+                'retry_at': None, 'last_error': None, 'updated_at': None, 'parse_failed': 0
+            }
+        return self.feeds[url]
+
+    def _save(self, feed: Dict[str, Any]):
+        feed['updated_at'] = time.time()
+        self.conn.execute(
+            'INSERT OR REPLACE INTO feed_health VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (feed['url'], feed['state'], feed['consecutive_failures'], feed['successes'],
+             feed['failures'], feed['latency'], feed['error_rate'], feed['backoff'],
+             feed['retry_at'], feed['last_error'], feed['updated_at'], feed['parse_failed'])
+        )
+        self.conn.commit()
+
+    def allow(self, url: str) -> bool:
+        """Whether a feed may be fetched now; moves expired open breakers to half-open"""
+        feed = self.feeds.get(url)
+        if feed is None or feed['state'] == CLOSED:
+            return True
+        if feed['state'] == OPEN and time.time() >= feed['retry_at']:
+            # Let one probe through
+            feed['state'] = HALF_OPEN
+            self.probing.add(url)
+            self._save(feed)
+            self.stats['probes'] += 1
+            return True
+        # Open, or half-open with the probe still in flight
+        self.stats['skipped'] += 1
+        return False
+
+    def retry_after(self, url: str) -> Optional[float]:
+        """Seconds until an open breaker lets a probe through"""
+        feed = self.feeds.get(url)
+        if feed is None or feed['state'] != OPEN:
+            return None
+        return max(0.0, feed['retry_at'] - time.time())
+
+    def _observe(self, feed: Dict[str, Any], latency: float, failed: bool):
+        if feed['latency'] is None:
+            feed['latency'] = latency
+        else:
+            feed['latency'] = self.smoothing * latency + (1 - self.smoothing) * feed['latency']
+        feed['error_rate'] = self.smoothing * float(failed) + (1 - self.smoothing) * feed['error_rate']
+
+    def record_success(self, url: str, latency: float):
+        self.probing.discard(url)
+        feed = self._feed(url)
+        self._observe(feed, latency, False)
+        if feed['state'] != CLOSED:
+            self.stats['recovered'] += 1
+        feed.update(state=CLOSED, consecutive_failures=0, backoff=None, retry_at=None)
+        feed['successes'] += 1
+        self._save(feed)
+
+    def record_failure(self, url: str, latency: float, error: Exception, parse_failed: bool = False):
+        """Count a failed fetch; ``parse_failed`` marks a body that arrived but couldn't be parsed"""
+        self.probing.discard(url)
+        feed = self._feed(url)
+        feed['parse_failed'] = int(parse_failed)
+        self._observe(feed, latency, True)
+        feed['failures'] += 1
+        feed['consecutive_failures'] += 1
+        feed['last_error'] = str(error)[:200] or type(error).__name__
+
+        if feed['state'] == HALF_OPEN:
+            # Failed probe: back off twice as long as last time
+            self._open(feed, min(self.max_backoff, feed['backoff'] * 2))
+        elif feed['state'] == CLOSED and feed['consecutive_failures'] >= self.failure_threshold:
+            self._open(feed, self.base_backoff)
+        self._save(feed)
+
+    def record_unchanged(self, url: str, latency: float):
+        """Repeat the previous outcome for a body identical to the last one.
+
+        Only a parse failure is repeated: after a timeout or server error,
+        any answer at all shows the feed is reachable again.
+        """
+        feed = self.feeds.get(url)
+        if feed is not None and feed['consecutive_failures'] and feed['parse_failed']:
+            self.record_failure(url, latency, ValueError(feed['last_error']), parse_failed=True)
+        else:
+            self.record_success(url, latency)
+
+    def _open(self, feed: Dict[str, Any], backoff: float):
+        feed.update(state=OPEN, backoff=backoff, retry_at=time.time() + backoff)
+        self.stats['opened'] += 1
+
+    def forget(self, urls: List[str]):
+        """Drop state of feeds no longer in the feed list"""
+        for url in set(self.feeds) - set(urls):
+            del self.feeds[url]
+            self.conn.execute('DELETE FROM feed_health WHERE url = ?', (url,))
+        self.conn.commit()
+
+    def unhealthy(self) -> List[Dict[str, Any]]:
+        """Feeds that are open, probing, failing or slow, worst first"""
+        feeds = [
+            feed for feed in self.feeds.values()
+            if feed['state'] != CLOSED or feed['consecutive_failures']
+            or (feed['latency'] or 0) >= self.slow_seconds
+        ]
+        return sorted(
+            feeds,
+            key=lambda feed: (feed['state'] == CLOSED, -feed['consecutive_failures'], -(feed['latency'] or 0))
+        )
+
+    def summary(self) -> str:
+        """One-line description of breaker states and this cycle's activity"""
+        states = {CLOSED: 0, OPEN: 0, HALF_OPEN: 0}
+        for feed in self.feeds.values():
+            states[feed['state']] += 1
+        return (
+            f"{states[CLOSED]} closed, {states[OPEN]} open, {states[HALF_OPEN]} half-open; "
+            f"{self.stats['skipped']} fetches skipped, {self.stats['probes']} probes, "
+            f"{self.stats['opened']} opened, {self.stats['recovered']} recovered"
+        )
+
+    def close(self):
+        self.conn.close()
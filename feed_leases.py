@@ -0,0 +1,103 @@
+import math
+import os
+import socket
+import sqlite3
+import time
+from typing import Any, Dict, Iterable, Optional, Set
+
+class FeedLeases:
+    """Splits the feed list between worker processes using expiring leases.
+
+    Workers share one SQLite database (WAL mode, so any number of
+    processes on a host can use it). Each worker heartbeats regularly and
+    on every ``rebalance`` renews its leases, drops leases held by workers
+    whose heartbeat is older than ``lease_ttl``, gives up feeds beyond its
+    fair share and claims unowned feeds up to it. A worker that dies stops
+    renewing, and its feeds are picked up by the others once its leases
+    expire.
+    """
+
+    def __init__(self, config: Dict[str, Any], worker_id: Optional[str] = None):
+        self.lease_ttl = config['lease_ttl']
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+
+        lease_dir = os.path.dirname(config['lease_file'])
+        if lease_dir:
+            os.makedirs(lease_dir, exist_ok=True)
+        # Autocommit mode; transactions are opened explicitly with BEGIN IMMEDIATE
+        self.conn = sqlite3.connect(config['lease_file'], timeout=30, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS workers (
+                worker_id TEXT PRIMARY KEY,
+                heartbeat REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS leases (
+                url TEXT PRIMARY KEY,
+                worker_id TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            );
+        """)
+
+    def rebalance(self, urls: Iterable[str]) -> Set[str]:
+        """Heartbeat, renew leases and take a fair share of ``urls``; returns the feeds owned"""
+        urls = sorted(set(urls))
+        now = time.time()
+        expires_at = now + self.lease_ttl
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO workers VALUES (?, ?)', (self.worker_id, now)
+            )
+            # Forget workers and leases that stopped heartbeating
+            self.conn.execute('DELETE FROM workers WHERE heartbeat < ?', (now - self.lease_ttl,))
+            self.conn.execute(
+                'DELETE FROM leases WHERE expires_at < ? OR worker_id NOT IN (SELECT worker_id FROM workers)',
+                (now,)
+            )
+            workers = self.conn.execute('SELECT COUNT(*) FROM workers').fetchone()[0]
+            fair_share = math.ceil(len(urls) / workers) if urls else 0
+
+            leases = dict(self.conn.execute('SELECT url, worker_id FROM leases'))
+            listed = set(urls)
+            owned = [url for url in urls if leases.get(url) == self.worker_id]
+            # Feeds removed from the list are released by whoever holds them
+            self.conn.executemany(
+                'DELETE FROM leases WHERE url = ?',
+                [(url,) for url in leases if url not in listed]
+            )
+
+            if len(owned) > fair_share:
+                # More workers joined: hand the excess back
+                released = owned[fair_share:]
+                owned = owned[:fair_share]
+                self.conn.executemany('DELETE FROM leases WHERE url = ?', [(url,) for url in released])
+            else:
+                unowned = [url for url in urls if url not in leases]
+                owned.extend(unowned[:fair_share - len(owned)])
+
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO leases VALUES (?, ?, ?)',
+                [(url, self.worker_id, expires_at) for url in owned]
+            )
+            self.conn.execute('COMMIT')
+        except Exception:
+            self.conn.execute('ROLLBACK')
+            raise
+        return set(owned)
+
+    def workers(self) -> int:
+        """Number of live workers sharing the feed list"""
+        return self.conn.execute(
+            'SELECT COUNT(*) FROM workers WHERE heartbeat >= ?', (time.time() - self.lease_ttl,)
+        ).fetchone()[0]
+
+    def release_all(self):
+        """Give up every lease so other workers can take over at once"""
+        self.conn.execute('BEGIN IMMEDIATE')
+        self.conn.execute('DELETE FROM leases WHERE worker_id = ?', (self.worker_id,))
+        self.conn.execute('DELETE FROM workers WHERE worker_id = ?', (self.worker_id,))
+        self.conn.execute('COMMIT')
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,217 @@
+import asyncio
+import heapq
+import os
+import random
+import sqlite3
+import time
+from typing import Any, Dict, Iterable, List, Optional
+import yaml
+
+class FeedScheduler:
+    """Adaptive per-feed polling schedule.
+
+    Feeds sit in a priority queue keyed by their next due time. After each
+    fetch a feed's interval is recomputed from an exponentially weighted
+    estimate of how often it publishes new entries, aiming for
+    ``target_new_per_fetch`` new entries per poll, bounded by
+    ``min_interval``/``max_interval`` and spread out with random jitter.
+    Feeds that keep returning nothing new back off towards the maximum.
+    State is kept in SQLite so the schedule survives restarts; worker
+    processes sharing the database each track only the feeds they poll.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        self.min_interval = config['min_interval']
+        self.max_interval = config['max_interval']
+        self.initial_interval = config['initial_interval']
+        self.target_new_per_fetch = config['target_new_per_fetch']
+        self.smoothing = config['smoothing']
+        self.idle_backoff = config['idle_backoff']
+        self.jitter = config['jitter']
+        self.poll_interval = config['poll_interval']
+
+        state_dir = os.path.dirname(config['state_file'])
+        if state_dir:
+            os.makedirs(state_dir, exist_ok=True)
+        # Shared by the worker processes on a host, like the lease database
+        self.conn = sqlite3.connect(config['state_file'], timeout=30)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS feed_schedule (
+                url TEXT PRIMARY KEY,
+                interval REAL NOT NULL,
+                next_due REAL NOT NULL,
+                rate REAL,
+                last_fetch REAL,
+                fetches INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        self.conn.commit()
+
+        # Tracked feeds only; set_feeds() loads their persisted state
+        self.feeds: Dict[str, Dict[str, Any]] = {}
+        self.heap: List = []
+        # Feeds handed out by due() and not yet reported back via record()
+        self.in_progress = set()
+        self.wakeup = asyncio.Event()
+
+    def set_feeds(self, urls: Iterable[str], listed: Optional[Iterable[str]] = None):
+        """Track exactly these feeds, picking up their persisted schedule.
+
+        ``listed`` is the whole feed list when ``urls`` is only this
+        worker's share of it; state is deleted only for feeds missing from
+        it, so other workers' rows are left alone. Feeds never seen before
+        become due immediately.
+        """
+        urls = list(dict.fromkeys(urls))
+        listed = set(urls if listed is None else listed) | set(urls)
+        now = time.time()
+        for url in set(self.feeds) - set(urls):
+            del self.feeds[url]
+        stored = [row['url'] for row in self.conn.execute('SELECT url FROM feed_schedule')]
+        self.conn.executemany(
+            'DELETE FROM feed_schedule WHERE url = ?', [(url,) for url in stored if url not in listed]
+        )
+        for url in urls:
+            if url in self.feeds:
+                continue
+            # E.g. a feed handed over by another worker, or tracked before a restart
+            row = self.conn.execute('SELECT * FROM feed_schedule WHERE url = ?', (url,)).fetchone()
+            if row is not None:
+                self.feeds[url] = dict(row)
+            else:
+                self.feeds[url] = {
+                    'url': url, 'interval': self.initial_interval, 'next_due': now,
+                    'rate': None, 'last_fetch': None, 'fetches': 0
+                }
+                self._save(self.feeds[url])
+        self.conn.commit()
+        self.heap = [
+            (feed['next_due'], url) for url, feed in self.feeds.items()
+            if url not in self.in_progress
+        ]
+        heapq.heapify(self.heap)
+        self.wakeup.set()
+
+    def _save(self, feed: Dict[str, Any]):
+        self.conn.execute(
+            'INSERT OR REPLACE INTO feed_schedule VALUES (?, ?, ?, ?, ?, ?)',
+            (feed['url'], feed['interval'], feed['next_due'], feed['rate'], feed['last_fetch'], feed['fetches'])
+        )
+
+    def due(self, now: Optional[float] = None) -> List[str]:
+        """Pop every feed that is due now"""
+        now = now or time.time()
+        urls = []
+        while self.heap and self.heap[0][0] <= now:
+            next_due, url = heapq.heappop(self.heap)
+            feed = self.feeds.get(url)
+            # Skip entries made stale by set_feeds() or a reschedule
+            if feed is None or feed['next_due'] != next_due or url in self.in_progress:
+                continue
+            self.in_progress.add(url)
+            urls.append(url)
+        return urls
+
+    def seconds_until_next(self, now: Optional[float] = None) -> float:
+        now = now or time.time()
+        if not self.heap:
+            return self.poll_interval
+        return max(0.0, self.heap[0][0] - now)
+
+    async def stream(self):
+        """Yield feed URLs as they fall due, forever"""
+        while True:
+            for url in self.due():
+                yield url
+            self.wakeup.clear()
+            try:
+                await asyncio.wait_for(
+                    self.wakeup.wait(),
+                    timeout=min(self.seconds_until_next(), self.poll_interval)
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    def record(self, url: str, new_entries: int, delay: Optional[float] = None):
+        """Reschedule a feed after a fetch that found ``new_entries`` new entries.
+
+        ``delay`` overrides the adaptive interval for this one reschedule,
+        e.g. to back off from a failing source.
+        """
+        self.in_progress.discard(url)
+        feed = self.feeds.get(url)
+        if feed is None:
+            return
+        now = time.time()
+
+        if feed['last_fetch'] is not None and delay is None:
+            elapsed = max(now - feed['last_fetch'], 1.0)
+            observed = new_entries / elapsed
+            if feed['rate'] is None:
+                feed['rate'] = observed
+            else:
+                feed['rate'] = self.smoothing * observed + (1 - self.smoothing) * feed['rate']
+
+            if new_entries == 0:
+                interval = feed['interval'] * self.idle_backoff
+            else:
+                interval = self.target_new_per_fetch / max(feed['rate'], 1e-9)
+            feed['interval'] = min(self.max_interval, max(self.min_interval, interval))
+
+        feed['last_fetch'] = now
+        feed['fetches'] += 1
+        wait = delay if delay is not None else feed['interval']
+        feed['next_due'] = now + wait * random.uniform(1 - self.jitter, 1 + self.jitter)
+        self._save(feed)
+        self.conn.commit()
+        heapq.heappush(self.heap, (feed['next_due'], url))
+        self.wakeup.set()
+
+    def record_failure(self, url: str, delay: Optional[float] = None):
+        """Reschedule a feed whose fetch failed, leaving its rate estimate alone.
+
+        ``delay`` pushes the next fetch further out than the feed's usual
+        interval, e.g. while its circuit breaker is open.
+        """
+        feed = self.feeds.get(url)
+        interval = feed['interval'] if feed else self.initial_interval
+        self.record(url, 0, delay=max(interval, delay or 0))
+
+    def fetches_per_hour(self) -> float:
+        """Expected fetches per hour at the current intervals"""
+        return sum(3600 / feed['interval'] for feed in self.feeds.values())
+
+    def report(self, legacy_cycle_seconds: float) -> Dict[str, float]:
+        """Compare the adaptive schedule with polling every feed each cycle"""
+        feeds = len(self.feeds)
+        legacy = feeds * 3600 / legacy_cycle_seconds if legacy_cycle_seconds else 0.0
+        adaptive = self.fetches_per_hour()
+        intervals = sorted(feed['interval'] for feed in self.feeds.values())
+        return {
+            'feeds': feeds,
+            'adaptive_fetches_per_hour': adaptive,
+            'legacy_fetches_per_hour': legacy,
+            'reduction': 1 - adaptive / legacy if legacy else 0.0,
+            'median_interval': intervals[len(intervals) // 2] if intervals else 0.0,
+        }
+
+def main():
+    """Print the expected fetch load of the persisted schedule"""
+    with open('config.yaml', 'r') as f:
+        config = yaml.safe_load(f)
+    with open(config['url_file'], 'r') as f:
+        urls = [line.strip() for line in f if line.strip()]
+
+    scheduler = FeedScheduler(config['scheduler'])
+    scheduler.set_feeds(urls)
+    report = scheduler.report(config['scheduler']['legacy_cycle_seconds'])
+    print(f"Feeds:                     {report['feeds']}")
+    print(f"Median interval:           {report['median_interval'] / 60:.1f} min")
+    print(f"Adaptive fetches per hour: {report['adaptive_fetches_per_hour']:.0f}")
+    print(f"Fixed-cycle fetches/hour:  {report['legacy_fetches_per_hour']:.0f}")
+    print(f"Reduction:                 {report['reduction']:.0%}")
+
+if __name__ == "__main__":
+    main()
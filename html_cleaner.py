@@ -0,0 +1,130 @@
+from html.parser import HTMLParser
+from typing import List, Optional
+from bs4.builder import HTMLTreeBuilder
+from bs4.dammit import EntitySubstitution
+
+# Text extraction matching BeautifulSoup(text, 'html.parser').get_text(' ', strip=True)
+# without building a tree. Two paths, cheapest first:
+#   plain  - no markup or entities at all, so only whitespace needs trimming
+#   simple - a streaming tag stripper on the stdlib tokenizer bs4 itself uses,
+#            replaying bs4's entity handling and string boundaries
+# A C parser such as libxml2 is faster still, but splits strings differently
+# (at stray end tags, around entities without a ';'), so its text isn't the same.
+
+# Strings inside these tags are not part of the text (scripts, stylesheets,
+# templates, ruby annotations)
+_HIDDEN = frozenset(HTMLTreeBuilder.DEFAULT_STRING_CONTAINERS)
+_VOID = frozenset(HTMLTreeBuilder.empty_element_tags)
+_ENTITIES = EntitySubstitution.HTML_ENTITY_TO_CHARACTER
+
+class _TextExtractor(HTMLParser):
+    """Collects text strings, breaking them wherever bs4 would"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.strings: List[str] = []
+        self.pending: List[str] = []
+        self.open_tags: List[str] = []
+        self.hidden_depth = 0
+        # Void elements whose redundant end tag is still to be swallowed
+        self.already_closed: List[str] = []
+
+    def flush(self, visible: Optional[bool] = None):
+        if self.pending:
+            text = ''.join(self.pending).strip()
+            self.pending = []
+            if visible is None:
+                visible = not self.hidden_depth
+            if text and visible:
+                self.strings.append(text)
+
+    def pop_to(self, name: str):
+        if name not in self.open_tags:
+            return
+        while True:
+            tag = self.open_tags.pop()
+            if tag in _HIDDEN:
+                self.hidden_depth -= 1
+            if tag == name:
+                return
+
+    def handle_starttag(self, tag, attrs, void=True):
+        self.flush()
+        self.open_tags.append(tag)
+        if tag in _HIDDEN:
+            self.hidden_depth += 1
+        if void and tag in _VOID:
+            self.pop_to(tag)
+            self.already_closed.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs, void=False)
+        self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in self.already_closed:
+            self.already_closed.remove(tag)
+            return
+        self.flush()
+        self.pop_to(tag)
+
+    def handle_data(self, data):
+        self.pending.append(data)
+
+    def handle_charref(self, name):
+        code = int(name[1:], 16) if name[:1] in 'xX' else int(name)
+        data = None
+        if code < 256:
+            # Numeric references below 256 are usually meant as Windows-1252
+            try:
+                data = bytes([code]).decode('windows-1252')
+            except UnicodeDecodeError:
+                pass
+        if not data:
+            try:
+                data = chr(code)
+            except (ValueError, OverflowError):
+                pass
+        self.pending.append(data or '\N{REPLACEMENT CHARACTER}')
+
+    def handle_entityref(self, name):
+        character = _ENTITIES.get(name)
+        self.pending.append(character if character is not None else f'&{name}')
+
+    def handle_comment(self, data):
+        self.flush()
+
+    def handle_decl(self, data):
+        self.flush()
+
+    def handle_pi(self, data):
+        self.flush()
+
+    def unknown_decl(self, data):
+        self.flush()
+        if data.upper().startswith('CDATA['):
+            # CDATA sections count as text wherever they appear
+            self.pending.append(data[len('CDATA['):])
+            self.flush(visible=True)
+
+def strip_tags(html_text: str) -> str:
+    """Streaming path: tokenize once, keep the text"""
+    extractor = _TextExtractor()
+    extractor.feed(html_text)
+    extractor.close()
+    extractor.flush()
+    return ' '.join(extractor.strings)
+
+def choose_path(html_text: str) -> str:
+    """Which path clean_html takes for a text"""
+    if '<' not in html_text and '&' not in html_text:
+        return 'plain'
+    return 'simple'
+
+def clean_html(html_text: Optional[str]) -> str:
+    """Remove HTML tags and clean the text"""
+    if not html_text:
+        return ''
+    if choose_path(html_text) == 'plain':
+        return html_text.strip()
+    return strip_tags(html_text)
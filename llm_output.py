@@ -0,0 +1,94 @@
+import difflib
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+TEXT_FIELDS = {'TITLE:': 'title', 'SUMMARY:': 'summary', 'CATEGORY:': 'category'}
+
+def analysis_schema(categories: List[str], with_category: bool = True) -> Dict[str, Any]:
+    """JSON schema for Ollama's ``format``, constraining category to the known list"""
+    properties = {
+        'title': {'type': 'string'},
+        'summary': {'type': 'string'}
+    }
+    if with_category:
+        properties['category'] = {'type': 'string', 'enum': list(categories)}
+    return {'type': 'object', 'properties': properties, 'required': list(properties)}
+
+def json_object_end(text: str) -> int:
+    """Index just past the first complete top-level JSON object, or -1"""
+    depth = 0
+    in_string = escaped = False
+    for index, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return index + 1
+    return -1
+
+def parse_json_response(text: str) -> Dict[str, str]:
+    """Fields of the first JSON object in a response"""
+    start = text.find('{')
+    end = json_object_end(text)
+    if start < 0 or end < 0:
+        return {}
+    try:
+        data = json.loads(text[start:end])
+    except ValueError:
+        return {}
+    return {key: str(value).strip() for key, value in data.items() if isinstance(value, (str, int, float))}
+
+def parse_text_response(text: str) -> Dict[str, str]:
+    """Fields of a TITLE:/SUMMARY:/CATEGORY: line-format response"""
+    fields = {}
+    for line in text.split('\n'):
+        for prefix, key in TEXT_FIELDS.items():
+            if line.startswith(prefix):
+                fields[key] = line.replace(prefix, '').strip()
+    return fields
+
+def text_response_complete(text: str, keys: List[str]) -> bool:
+    """Whether every wanted line has been generated and terminated"""
+    # The last line may still be growing, so only count finished ones
+    finished = text[:text.rfind('\n') + 1]
+    fields = parse_text_response(finished)
+    return all(fields.get(key) for key in keys)
+
+def json_response_complete(text: str) -> bool:
+    return json_object_end(text) >= 0
+
+_SEPARATORS = re.compile(r'\s*(?:,|/|;|\band\b|\(|\n)\s*')
+
+def _normalize(category: str) -> str:
+    return re.sub(r'[\s_]+', '-', category.strip().strip('.*"\'[]')).lower()
+
+def match_category(raw: str, categories: List[str], cutoff: float) -> Optional[str]:
+    """Map an LLM category answer to a valid one, tolerating near misses.
+
+    Handles case and spacing differences, several categories where one was
+    asked for (the first is taken) and small misspellings.
+    """
+    if raw in categories:
+        return raw
+    by_normalized = {_normalize(category): category for category in categories}
+    for part in [raw] + _SEPARATORS.split(raw):
+        normalized = _normalize(part)
+        if not normalized:
+            continue
+        if normalized in by_normalized:
+            return by_normalized[normalized]
+        close = difflib.get_close_matches(normalized, list(by_normalized), n=1, cutoff=cutoff)
+        if close:
+            return by_normalized[close[0]]
+    return None
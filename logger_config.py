@@ -1,37 +1,57 @@
+import atexit
 import logging
-import yaml
+import logging.handlers
 import os
+import queue
+import threading
+import yaml
+
+# Records go through a queue to one listener thread that owns the file and
+# console handlers, so logging never blocks the event loop on disk writes.
+# The listener is set up once per process, on the first setup_logger call.
+_lock = threading.Lock()
+_queue_handler = None
+_config = None
+
+def logging_config():
+    """The logging section of config.yaml, read once per process"""
+    global _config
+    if _config is None:
+        with open('config.yaml', 'r') as f:
+            _config = yaml.safe_load(f)['logging']
+    return _config
+
+def _start_listener():
+    global _queue_handler
+    config = logging_config()
 
-def setup_logger(name):
-    # Load config
-    with open('config.yaml', 'r') as f:
-        config = yaml.safe_load(f)
-    
-    # Create logger
-    logger = logging.getLogger(name)
-    logger.setLevel(config['logging']['level'])
-    
     # Ensure logs directory exists
-    log_path = config['logging']['file']
+    log_path = config['file']
     log_dir = os.path.dirname(log_path)
-    
-    # Create logs directory if it doesn't exist
     if log_dir:
         os.makedirs(log_dir, exist_ok=True)
-    
-    # Create handlers
+
+    formatter = logging.Formatter(config['format'])
     file_handler = logging.FileHandler(log_path)
     console_handler = logging.StreamHandler()
-    
-    # Create formatter
-    formatter = logging.Formatter(config['logging']['format'])
-    
-    # Set formatter for handlers
     file_handler.setFormatter(formatter)
     console_handler.setFormatter(formatter)
-    
-    # Add handlers to logger
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
-    
+
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, file_handler, console_handler)
+    listener.start()
+    # Drain what is still queued when the process exits
+    atexit.register(listener.stop)
+    _queue_handler = logging.handlers.QueueHandler(log_queue)
+
+def setup_logger(name):
+    """Named logger writing through the shared queue; safe to call repeatedly"""
+    with _lock:
+        if _queue_handler is None:
+            _start_listener()
+
+    logger = logging.getLogger(name)
+    logger.setLevel(logging_config()['level'])
+    if _queue_handler not in logger.handlers:
+        logger.addHandler(_queue_handler)
     return logger
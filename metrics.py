@@ -0,0 +1,201 @@
+import json
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+from logger_config import setup_logger
+
+logger = setup_logger('metrics')
+
+# Stages timed across both workers, in pipeline order
+STAGES = ('fetch', 'parse', 'clean', 'translate', 'llm', 'insert', 'xml_build', 'upload')
+
+class _Timing:
+    __slots__ = ('calls', 'seconds', 'max')
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float):
+        self.calls += 1
+        self.seconds += seconds
+        self.max = max(self.max, seconds)
+
+class Metrics:
+    """Process-wide stage timers, counters and gauges.
+
+    Every value is kept twice: since the process started (exported by the
+    metrics endpoint) and since the current cycle began (written as one
+    summary record per cycle). Safe to update from worker threads.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started_at = time.time()
+        self.totals: Dict[str, _Timing] = {}
+        self.counters: Dict[str, float] = {}
+        self.gauges: Dict[str, Dict[str, float]] = {}
+        self.reset_cycle()
+
+    def reset_cycle(self):
+        """Start a new per-cycle tally"""
+        with self.lock:
+            self.cycle_started_at = time.time()
+            self.cycle: Dict[str, _Timing] = {}
+            self.cycle_counters: Dict[str, float] = {}
+
+    def observe(self, stage: str, seconds: float):
+        with self.lock:
+            for timings in (self.totals, self.cycle):
+                timings.setdefault(stage, _Timing()).add(seconds)
+
+    @contextmanager
+    def timer(self, stage: str):
+        """Time the enclosed block as one call of a stage, also when it raises"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+
+    def incr(self, name: str, value: float = 1):
+        with self.lock:
+            for counters in (self.counters, self.cycle_counters):
+                counters[name] = counters.get(name, 0) + value
+
+    def set_gauge(self, name: str, value: float, stage: str = ''):
+        with self.lock:
+            self.gauges.setdefault(name, {})[stage] = value
+
+    @staticmethod
+    def _stages(timings: Dict[str, _Timing], elapsed: Optional[float] = None) -> Dict[str, Dict[str, float]]:
+        ordered = [stage for stage in STAGES if stage in timings] + sorted(set(timings) - set(STAGES))
+        stages = {}
+        for stage in ordered:
+            timing = timings[stage]
+            stages[stage] = {
+                'calls': timing.calls,
+                'seconds': round(timing.seconds, 4),
+                'avg': round(timing.seconds / timing.calls, 4) if timing.calls else 0.0,
+                'max': round(timing.max, 4)
+            }
+            if elapsed:
+                # Average number of calls in progress: the stage that saturates
+                # its worker or connection limit is the one capping throughput
+                stages[stage]['concurrency'] = round(timing.seconds / elapsed, 3)
+        return stages
+
+    def cycle_summary(self) -> Dict[str, Any]:
+        with self.lock:
+            now = time.time()
+            elapsed = now - self.cycle_started_at
+            return {
+                'started_at': self.cycle_started_at,
+                'ended_at': now,
+                'seconds': round(elapsed, 3),
+                'stages': self._stages(self.cycle, elapsed),
+                'counters': dict(self.cycle_counters)
+            }
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Cumulative values since the process started"""
+        with self.lock:
+            now = time.time()
+            return {
+                'uptime': round(now - self.started_at, 3),
+                'stages': self._stages(self.totals),
+                'counters': dict(self.counters),
+                'gauges': {name: dict(values) for name, values in self.gauges.items()},
+                'cycle': {
+                    'seconds': round(now - self.cycle_started_at, 3),
+                    'stages': self._stages(self.cycle, now - self.cycle_started_at),
+                    'counters': dict(self.cycle_counters)
+                }
+            }
+
+    def prometheus(self) -> str:
+        """Cumulative values in the Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        lines = [
+            '# HELP rss_stage_seconds_total Time spent in each stage.',
+            '# TYPE rss_stage_seconds_total counter'
+        ]
+        lines += [f'rss_stage_seconds_total{{stage="{stage}"}} {values["seconds"]}'
+                  for stage, values in snapshot['stages'].items()]
+        lines += ['# HELP rss_stage_calls_total Calls of each stage.', '# TYPE rss_stage_calls_total counter']
+        lines += [f'rss_stage_calls_total{{stage="{stage}"}} {values["calls"]}'
+                  for stage, values in snapshot['stages'].items()]
+        lines += ['# HELP rss_stage_max_seconds Slowest single call of each stage.', '# TYPE rss_stage_max_seconds gauge']
+        lines += [f'rss_stage_max_seconds{{stage="{stage}"}} {values["max"]}'
+                  for stage, values in snapshot['stages'].items()]
+        for name, value in sorted(snapshot['counters'].items()):
+            lines += [f'# TYPE rss_{name}_total counter', f'rss_{name}_total {value}']
+        for name, values in sorted(snapshot['gauges'].items()):
+            lines.append(f'# TYPE rss_{name} gauge')
+            lines += [f'rss_{name}{{stage="{stage}"}} {value}' if stage else f'rss_{name} {value}'
+                      for stage, value in sorted(values.items())]
+        lines += ['# TYPE rss_uptime_seconds gauge', f'rss_uptime_seconds {snapshot["uptime"]}']
+        return '\n'.join(lines) + '\n'
+
+    def write_cycle_summary(self, path: str, worker: str, **extra):
+        """Append this cycle's summary as one JSON line, then start a new cycle"""
+        record = {'worker': worker, 'host': socket.gethostname(), 'pid': os.getpid(),
+                  **self.cycle_summary(), **extra}
+        try:
+            summary_dir = os.path.dirname(path)
+            if summary_dir:
+                os.makedirs(summary_dir, exist_ok=True)
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+        except OSError as e:
+            logger.error(f"Error writing cycle summary: {str(e)}")
+        self.reset_cycle()
+
+    def serve(self, host: str, port: int) -> Optional[ThreadingHTTPServer]:
+        """Serve /metrics (Prometheus text) and /metrics.json from a daemon thread"""
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                path = self.path.split('?', 1)[0]
+                if path == '/metrics':
+                    body, content_type = registry.prometheus().encode('utf-8'), 'text/plain; version=0.0.4'
+                elif path == '/metrics.json':
+                    body, content_type = json.dumps(registry.snapshot()).encode('utf-8'), 'application/json'
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        try:
+            server = ThreadingHTTPServer((host, port), Handler)
+        except OSError as e:
+            # E.g. another worker process on this host already has the port
+            logger.warning(f"Metrics endpoint not started on {host}:{port}: {str(e)}")
+            return None
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        logger.info(f"Metrics endpoint listening on http://{host}:{port}/metrics")
+        return server
+
+# Shared by every module of the process
+METRICS = Metrics()
+
+def start_endpoint(config: Dict[str, Any], worker: str) -> Optional[ThreadingHTTPServer]:
+    """Start the metrics endpoint if a port is configured for this worker"""
+    port = config.get(f'{worker}_port')
+    if not port:
+        return None
+    return METRICS.serve(config['host'], port)
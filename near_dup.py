@@ -0,0 +1,172 @@
+import hashlib
+import os
+import re
+import sqlite3
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, Optional, Tuple
+
+_WORD = re.compile(r'\w+')
+_BITS = 64
+
+def _signed(value: int) -> int:
+    # SQLite integers are signed 64-bit
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+def simhash(text: str, min_tokens: int = 0) -> Optional[int]:
+    """64-bit SimHash of a text's words and word pairs; None for very short texts"""
+    words = _WORD.findall(text.lower())
+    if len(words) < min_tokens:
+        return None
+    tokens = words + [f'{a} {b}' for a, b in zip(words, words[1:])]
+    weights = [0] * _BITS
+    for token in tokens:
+        h = int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'big')
+        for bit in range(_BITS):
+            weights[bit] += 1 if h >> bit & 1 else -1
+    return sum(1 << bit for bit in range(_BITS) if weights[bit] > 0)
+
+class NearDupIndex:
+    """Rolling window of SimHash fingerprints of analysed articles.
+
+    Fingerprints are split into ``max_distance + 1`` bands; by the
+    pigeonhole principle two fingerprints within ``max_distance`` bits
+    share at least one band exactly, so only articles in the same band
+    buckets are compared. The window holds at most ``max_entries``
+    articles from the last ``window_hours``; older ones are evicted.
+    Entries and detected duplicates are kept in SQLite.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        self.max_distance = config['max_distance']
+        self.min_tokens = config['min_tokens']
+        self.max_entries = config['max_entries']
+        self.window = config['window_hours'] * 3600
+        self.bands = self.max_distance + 1
+        self.band_bits = -(-_BITS // self.bands)
+
+        index_dir = os.path.dirname(config['index_file'])
+        if index_dir:
+            os.makedirs(index_dir, exist_ok=True)
+        self.conn = sqlite3.connect(config['index_file'])
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS fingerprints (
+                link TEXT PRIMARY KEY,
+                simhash INTEGER NOT NULL,
+                ai_title TEXT,
+                ai_summary TEXT,
+                ai_category TEXT,
+                added_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS fingerprints_added_at ON fingerprints (added_at);
+            CREATE TABLE IF NOT EXISTS duplicates (
+                link TEXT PRIMARY KEY,
+                source_url TEXT,
+                duplicate_of TEXT NOT NULL,
+                distance INTEGER NOT NULL,
+                detected_at REAL NOT NULL
+            );
+        """)
+        self.entries: OrderedDict = OrderedDict()
+        self.buckets: Dict[Tuple[int, int], set] = defaultdict(set)
+        rows = self.conn.execute(
+            'SELECT * FROM fingerprints WHERE added_at >= ? ORDER BY added_at DESC LIMIT ?',
+            (time.time() - self.window, self.max_entries)
+        ).fetchall()
+        for row in reversed(rows):
+            self._insert(row['link'], row['simhash'] % (1 << 64), dict(row))
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Start a new per-cycle tally"""
+        self.stats = {'checked': 0, 'duplicates': 0}
+
+    def fingerprint(self, text: str) -> Optional[int]:
+        return simhash(text, self.min_tokens)
+
+    def _band_keys(self, value: int):
+        mask = (1 << self.band_bits) - 1
+        return [(band, value >> (band * self.band_bits) & mask) for band in range(self.bands)]
+
+    def _insert(self, link: str, value: int, fields: Dict[str, Any]):
+        if link in self.entries:
+            self._remove(link)
+        self.entries[link] = (value, fields)
+        for key in self._band_keys(value):
+            self.buckets[key].add(link)
+
+    def _remove(self, link: str):
+        value, _ = self.entries.pop(link)
+        for key in self._band_keys(value):
+            bucket = self.buckets[key]
+            bucket.discard(link)
+            if not bucket:
+                del self.buckets[key]
+
+    def _evict(self):
+        expired = time.time() - self.window
+        while self.entries:
+            link, (_, fields) = next(iter(self.entries.items()))
+            if len(self.entries) <= self.max_entries and fields['added_at'] >= expired:
+                break
+            self._remove(link)
+
+    def find(self, value: int) -> Optional[Dict[str, Any]]:
+        """Closest analysed article within max_distance bits, with its distance"""
+        self.stats['checked'] += 1
+        candidates = set()
+        for key in self._band_keys(value):
+            candidates |= self.buckets.get(key, set())
+        best = None
+        for link in candidates:
+            other, fields = self.entries[link]
+            distance = bin(value ^ other).count('1')
+            if distance <= self.max_distance and (best is None or distance < best['distance']):
+                best = dict(fields, link=link, distance=distance)
+        return best
+
+    def add(self, link: str, value: int, article: Dict[str, Any]):
+        """Add an analysed article to the window"""
+        fields = {
+            'ai_title': article['ai_title'],
+            'ai_summary': article['ai_summary'],
+            'ai_category': article['ai_category'],
+            'added_at': time.time()
+        }
+        self._insert(link, value, fields)
+        self._evict()
+        self.conn.execute(
+            'INSERT OR REPLACE INTO fingerprints VALUES (?, ?, ?, ?, ?, ?)',
+            (link, _signed(value), fields['ai_title'], fields['ai_summary'],
+             fields['ai_category'], fields['added_at'])
+        )
+        self.conn.commit()
+
+    def record_duplicate(self, link: str, source_url: str, match: Dict[str, Any]):
+        """Log an entry that reused the analysis of a near-duplicate"""
+        self.stats['duplicates'] += 1
+        self.conn.execute(
+            'INSERT OR REPLACE INTO duplicates VALUES (?, ?, ?, ?, ?)',
+            (link, source_url, match['link'], match['distance'], time.time())
+        )
+        self.conn.commit()
+
+    def prune(self) -> int:
+        """Drop stored fingerprints that fell out of the window"""
+        self._evict()
+        cursor = self.conn.execute(
+            'DELETE FROM fingerprints WHERE added_at < ?', (time.time() - self.window,)
+        )
+        self.conn.commit()
+        return cursor.rowcount
+
+    def summary(self) -> str:
+        """One-line description of this cycle's duplicate detection"""
+        return (
+            f"{self.stats['duplicates']} of {self.stats['checked']} entries were near-duplicates, "
+            f"{len(self.entries)} articles in window"
+        )
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,201 @@
+import asyncio
+import json
+import time
+from typing import Any, Callable, Dict, List, Optional, Union
+import aiohttp
+from logger_config import setup_logger
+from metrics import METRICS
+
+logger = setup_logger('ollama_client')
+
+class Backend:
+    """One Ollama server with its load and health"""
+
+    def __init__(self, url: str, max_concurrent: int):
+        self.url = url.rstrip('/')
+        self.generate_url = f"{self.url}/api/generate"
+        self.max_concurrent = max_concurrent
+        self.in_flight = 0
+        # Exponentially weighted seconds per generation; None until measured
+        self.latency: Optional[float] = None
+        self.unhealthy_until = 0.0
+        self.requests = 0
+        self.failures = 0
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.unhealthy_until
+
+    @property
+    def has_capacity(self) -> bool:
+        return self.in_flight < self.max_concurrent
+
+    def load(self, default_latency: float) -> float:
+        """Expected wait if one more request were sent here"""
+        return (self.in_flight + 1) * (self.latency or default_latency)
+
+class OllamaClient:
+    """Async Ollama client routing generations across one or more servers.
+
+    Each request goes to the healthy backend with spare capacity and the
+    lowest expected wait (in-flight requests times recent latency). A
+    backend that fails is skipped for ``cooldown`` seconds. Requests carry
+    ``keep_alive`` so models stay loaded between cycles, and ``warm_up``
+    loads the model on every backend ahead of the first article.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        endpoints = config.get('endpoints') or [
+            {'url': config['url'], 'max_concurrent': config['max_concurrent']}
+        ]
+        self.backends: List[Backend] = [
+            Backend(endpoint['url'], endpoint.get('max_concurrent', config['max_concurrent']))
+            for endpoint in endpoints
+        ]
+        # Signalled whenever a backend slot frees up
+        self.slot_freed = asyncio.Condition()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._warmed = False
+        self.reset_stats()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=sum(backend.max_concurrent for backend in self.backends),
+                keepalive_timeout=60
+            )
+            timeout = aiohttp.ClientTimeout(
+                total=self.config['request_timeout'],
+                connect=self.config['connect_timeout']
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        return self._session
+
+    def _choose(self) -> Optional[Backend]:
+        """Least-loaded backend with a free slot, if any"""
+        measured = [backend.latency for backend in self.backends if backend.latency]
+        default_latency = min(measured) if measured else 1.0
+        # Backends cooling down are only tried when none are healthy
+        pool = [backend for backend in self.backends if backend.healthy] or self.backends
+        candidates = [backend for backend in pool if backend.has_capacity]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda backend: backend.load(default_latency))
+
+    async def _acquire(self) -> Backend:
+        async with self.slot_freed:
+            while True:
+                backend = self._choose()
+                if backend is not None:
+                    backend.in_flight += 1
+                    return backend
+                try:
+                    # Also re-check periodically, as cooldowns expire unannounced
+                    await asyncio.wait_for(self.slot_freed.wait(), timeout=1.0)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _release(self, backend: Backend):
+        async with self.slot_freed:
+            backend.in_flight -= 1
+            self.slot_freed.notify()
+
+    def _mark_failed(self, backend: Backend, error: Exception):
+        backend.failures += 1
+        backend.unhealthy_until = time.monotonic() + self.config['cooldown']
+        logger.warning(f"Ollama backend {backend.url} failed, cooling down: {str(error)}")
+
+    async def generate(self, prompt: str, format: Union[str, Dict[str, Any], None] = None,
+                       done: Optional[Callable[[str], bool]] = None) -> str:
+        """Run a streamed generation and return the response text.
+
+        ``format`` is passed to Ollama as is ("json" or a JSON schema).
+        ``done`` is called with the text so far after every chunk; once it
+        returns True the connection is dropped, which stops the generation.
+        """
+        payload = {
+            "model": self.config['model'],
+            "prompt": prompt,
+            "stream": True,
+            "keep_alive": self.config['keep_alive']
+        }
+        if format is not None:
+            payload['format'] = format
+        chunks = []
+        backend = await self._acquire()
+        backend.requests += 1
+        started = time.monotonic()
+        try:
+            session = self._get_session()
+            async with session.post(backend.generate_url, json=payload) as response:
+                response.raise_for_status()
+                self.stats['generations'] += 1
+                # One JSON object per line
+                async for line in response.content:
+                    if not line.strip():
+                        continue
+                    data = json.loads(line)
+                    chunks.append(data.get('response', ''))
+                    self.stats['chunks'] += 1
+                    if data.get('done'):
+                        break
+                    if done is not None and done(''.join(chunks)):
+                        self.stats['early_exits'] += 1
+                        response.close()
+                        break
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self._mark_failed(backend, e)
+            METRICS.incr('llm_failures')
+            raise
+        finally:
+            await self._release(backend)
+        elapsed = time.monotonic() - started
+        METRICS.observe('llm', elapsed)
+        smoothing = self.config['latency_smoothing']
+        backend.latency = elapsed if backend.latency is None \
+            else smoothing * elapsed + (1 - smoothing) * backend.latency
+        return ''.join(chunks)
+
+    async def _warm(self, backend: Backend):
+        # A generate request without a prompt just loads the model
+        payload = {"model": self.config['model'], "keep_alive": self.config['keep_alive']}
+        try:
+            session = self._get_session()
+            async with session.post(backend.generate_url, json=payload) as response:
+                response.raise_for_status()
+                await response.read()
+            logger.info(f"Ollama backend {backend.url} warmed up")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self._mark_failed(backend, e)
+
+    async def warm_up(self):
+        """Load the model on every backend, once per process"""
+        if self._warmed:
+            return
+        self._warmed = True
+        await asyncio.gather(*(self._warm(backend) for backend in self.backends))
+
+    def reset_stats(self):
+        self.stats = {'generations': 0, 'early_exits': 0, 'chunks': 0}
+        for backend in self.backends:
+            backend.requests = backend.failures = 0
+
+    def summary(self) -> str:
+        backends = ', '.join(
+            f"{backend.url} {backend.requests} req"
+            + (f" {backend.latency:.1f}s" if backend.latency is not None else "")
+            + (f" {backend.failures} failed" if backend.failures else "")
+            + ("" if backend.healthy else " (cooling down)")
+            for backend in self.backends
+        )
+        return (
+            f"{self.stats['generations']} generations, {self.stats['chunks']} chunks streamed, "
+            f"{self.stats['early_exits']} stopped early; {backends}"
+        )
+
+    async def close(self):
+        """Close the pooled connections"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
@@ -0,0 +1,134 @@
+import asyncio
+import time
+from typing import Any, AsyncIterable, Awaitable, Callable, Dict, Iterable, List, Optional, Union
+
+# Marks the end of a stage's input; one is queued per worker
+_STOP = object()
+
+class Stage:
+    """A pipeline stage: a pool of workers reading from a bounded queue.
+
+    ``handler(item, emit)`` processes one item and calls ``await emit(result)``
+    for every item it passes on. ``emit`` blocks while the downstream queue
+    is full, which is what propagates backpressure up the pipeline.
+
+    With ``batch_size`` above one the handler receives a list of up to that
+    many items: whatever is already queued when a worker picks up work.
+    """
+
+    def __init__(self, name: str, handler: Callable[..., Awaitable[None]],
+                 workers: int = 1, queue_size: int = 0, batch_size: int = 1):
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.batch_size = batch_size
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.processed = 0
+        self.errors = 0
+        self.busy = 0
+        self.started_at: Optional[float] = None
+
+    def throughput(self) -> float:
+        """Items processed per second since the stage started"""
+        if not self.started_at:
+            return 0.0
+        elapsed = time.monotonic() - self.started_at
+        return self.processed / elapsed if elapsed > 0 else 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'queue': self.queue.qsize(),
+            'busy': self.busy,
+            'processed': self.processed,
+            'errors': self.errors,
+            'rate': self.throughput()
+        }
+
+class Pipeline:
+    """Stages joined by bounded queues, each drained by its own workers"""
+
+    def __init__(self, stages: List[Stage],
+                 on_error: Optional[Callable[[Stage, Any, Exception], None]] = None):
+        self.stages = stages
+        self.by_name = {stage.name: stage for stage in stages}
+        self.on_error = on_error
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        return [stage.snapshot() for stage in self.stages]
+
+    def _emitter(self, index: int):
+        next_stage = self.stages[index + 1] if index + 1 < len(self.stages) else None
+
+        async def emit(item, stage: Optional[str] = None):
+            # Items may skip ahead to a later stage by name
+            target = self.by_name[stage] if stage else next_stage
+            if target is not None:
+                await target.queue.put(item)
+
+        return emit
+
+    async def _worker(self, stage: Stage, emit):
+        while True:
+            item = await stage.queue.get()
+            if item is _STOP:
+                return
+            stopping = False
+            count = 1
+            if stage.batch_size > 1:
+                # Take whatever else is already waiting, up to the batch size
+                item = [item]
+                while len(item) < stage.batch_size and not stage.queue.empty():
+                    extra = stage.queue.get_nowait()
+                    if extra is _STOP:
+                        stopping = True
+                        break
+                    item.append(extra)
+                count = len(item)
+            stage.busy += 1
+            try:
+                await stage.handler(item, emit)
+            except Exception as e:
+                stage.errors += count
+                if self.on_error:
+                    self.on_error(stage, item, e)
+            finally:
+                stage.busy -= 1
+                stage.processed += count
+            if stopping:
+                return
+
+    async def run(self, source: Union[Iterable[Any], AsyncIterable[Any]]):
+        """Push every source item through the pipeline and wait for it to drain.
+
+        ``source`` may be an async iterable, e.g. one that keeps yielding
+        work indefinitely; the pipeline then runs until cancelled.
+        """
+        now = time.monotonic()
+        workers = []
+        for index, stage in enumerate(self.stages):
+            stage.started_at = now
+            emit = self._emitter(index)
+            workers.append([
+                asyncio.create_task(self._worker(stage, emit))
+                for _ in range(stage.workers)
+            ])
+
+        try:
+            first = self.stages[0]
+            if hasattr(source, '__aiter__'):
+                async for item in source:
+                    await first.queue.put(item)
+            else:
+                for item in source:
+                    await first.queue.put(item)
+
+            # Close each stage once everything upstream of it has finished
+            for index, stage in enumerate(self.stages):
+                for _ in range(stage.workers):
+                    await stage.queue.put(_STOP)
+                await asyncio.gather(*workers[index])
+        finally:
+            for tasks in workers:
+                for task in tasks:
+                    task.cancel()
@@ -0,0 +1,130 @@
+import gzip
+import json
+import os
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from dateutil import parser
+from dateutil.relativedelta import relativedelta
+from postgrest.types import ReturnMethod
+from logger_config import setup_logger
+from metrics import METRICS
+
+logger = setup_logger('retention')
+
+class RetentionJob:
+    """Archives and then deletes articles past their retention age.
+
+    Expired rows are read in batches ordered by ``key_column``, appended
+    to gzip-compressed JSONL files partitioned by the day they were
+    created, and deleted by key without returning the rows. The cutoff
+    is rounded down to UTC midnight. Once a run has cleared everything
+    before a cutoff it is recorded as the watermark. Runs later that day
+    find the watermark already at the cutoff and issue no queries at all.
+    """
+
+    def __init__(self, supabase, config: Dict[str, Any]):
+        self.supabase = supabase
+        self.max_age = relativedelta(months=config['max_age_months'])
+        self.batch_size = config['batch_size']
+        self.max_batches = config['max_batches']
+        self.key_column = config['key_column']
+        self.archive_dir = config['archive_dir']
+        self.state_file = config['state_file']
+
+    def load_state(self) -> Dict[str, Any]:
+        try:
+            with open(self.state_file, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {'completed_before': None, 'archived': 0}
+
+    def save_state(self, state: Dict[str, Any]):
+        state_dir = os.path.dirname(self.state_file)
+        if state_dir:
+            os.makedirs(state_dir, exist_ok=True)
+        tmp_path = f"{self.state_file}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, self.state_file)
+
+    def cutoff(self, now: Optional[datetime] = None) -> datetime:
+        """Start of the UTC day articles must be older than to expire"""
+        expired = (now or datetime.now(timezone.utc)) - self.max_age
+        return expired.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    def partition_path(self, day: str) -> str:
+        return os.path.join(self.archive_dir, 'articles', day[:4], day[5:7], f"{day}.jsonl.gz")
+
+    def archive(self, rows: List[Dict[str, Any]]):
+        """Append rows to their day's archive file, durably, before they are deleted"""
+        by_day = defaultdict(list)
+        for row in rows:
+            created = parser.isoparse(row['created_at']).astimezone(timezone.utc)
+            by_day[created.date().isoformat()].append(row)
+        for day, day_rows in by_day.items():
+            path = self.partition_path(day)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Each append adds a gzip member; gzip.open reads them back as one stream
+            with open(path, 'ab') as raw:
+                with gzip.GzipFile(fileobj=raw, mode='ab') as f:
+                    for row in day_rows:
+                        f.write((json.dumps(row, ensure_ascii=False) + '\n').encode('utf-8'))
+                raw.flush()
+                os.fsync(raw.fileno())
+
+    def run(self) -> Dict[str, Any]:
+        """Archive and delete one bounded run's worth of expired articles"""
+        state = self.load_state()
+        cutoff = self.cutoff().isoformat()
+        if state['completed_before'] is not None and state['completed_before'] >= cutoff:
+            return {'archived': 0, 'batches': 0, 'complete': True, 'skipped': True, 'cutoff': cutoff}
+
+        archived = batches = 0
+        complete = False
+        with METRICS.timer('retention'):
+            while batches < self.max_batches:
+                rows = self.supabase.table('articles')\
+                    .select('*')\
+                    .lt('created_at', cutoff)\
+                    .order(self.key_column)\
+                    .limit(self.batch_size)\
+                    .execute().data
+                if not rows:
+                    complete = True
+                    break
+                self.archive(rows)
+                self.supabase.table('articles')\
+                    .delete(returning=ReturnMethod.minimal)\
+                    .in_(self.key_column, [row[self.key_column] for row in rows])\
+                    .execute()
+                archived += len(rows)
+                batches += 1
+                if len(rows) < self.batch_size:
+                    complete = True
+                    break
+
+        state['archived'] = state.get('archived', 0) + archived
+        if complete:
+            # Nothing older than the cutoff is left: later runs today can skip the scan
+            state['completed_before'] = cutoff
+        self.save_state(state)
+        METRICS.incr('articles_archived', archived)
+        logger.info(
+            f"Retention: {archived} articles archived and deleted in {batches} batches, "
+            f"{'complete' if complete else 'more left'} before {cutoff}"
+        )
+        return {'archived': archived, 'batches': batches, 'complete': complete, 'skipped': False, 'cutoff': cutoff}
+
+if __name__ == "__main__":
+    # One run: python retention.py
+    import yaml
+    from dotenv import load_dotenv
+    from supabase import create_client
+
+    load_dotenv()
+    with open('config.yaml', 'r') as f:
+        config = yaml.safe_load(f)
+    client = create_client(os.getenv('SUPABASE_URL'), os.getenv('SUPABASE_KEY'))
+    result = RetentionJob(client, config['retention']).run()
+    print(json.dumps(result))
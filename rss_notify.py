@@ -0,0 +1,44 @@
+import json
+import os
+import time
+import uuid
+from typing import Iterable, Set
+from logger_config import setup_logger
+
+logger = setup_logger('rss_notify')
+
+# Local stand-in for a LISTEN/NOTIFY channel: every event is one small JSON
+# file in a spool directory, written atomically so readers never see half
+# of one. Any number of writers and one reader may share the directory.
+
+def notify(spool_dir: str, categories: Iterable[str]):
+    """Announce that articles in these categories were saved"""
+    categories = sorted({category for category in categories if category})
+    if not categories:
+        return
+    os.makedirs(spool_dir, exist_ok=True)
+    name = f"{time.time_ns()}-{uuid.uuid4().hex[:8]}"
+    tmp_path = os.path.join(spool_dir, f".{name}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'categories': categories, 'created_at': time.time()}, f)
+    os.replace(tmp_path, os.path.join(spool_dir, f"{name}.json"))
+
+def drain(spool_dir: str) -> Set[str]:
+    """Consume every pending event and return the union of their categories"""
+    try:
+        names = sorted(name for name in os.listdir(spool_dir) if name.endswith('.json'))
+    except FileNotFoundError:
+        return set()
+    categories = set()
+    for name in names:
+        path = os.path.join(spool_dir, name)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                categories.update(json.load(f)['categories'])
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Skipping unreadable event {name}: {str(e)}")
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    return categories
@@ -0,0 +1,83 @@
+import gzip
+import hashlib
+import io
+import re
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from functools import lru_cache
+from typing import Dict, Iterable
+
+# Control characters that are not allowed anywhere in XML 1.0
+_INVALID_XML_CHARS = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+
+def escape(text) -> str:
+    """Escape text for use in XML element content or attributes"""
+    text = str(text)
+    # isprintable() is a cheap pre-check; the regex only runs when needed
+    if not text.isprintable():
+        text = _INVALID_XML_CHARS.sub('', text)
+    # Chained replace() is much faster than str.translate() here
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;').replace('"', '&quot;')
+
+@lru_cache(maxsize=65536)
+def format_pub_date(published: str, created_at: str) -> str:
+    """RFC 822 pubDate from the feed's published string or created_at.
+
+    Results are cached, so each article's date is parsed once per process
+    rather than on every rebuild.
+    """
+    try:
+        pub_date = datetime.strptime(published, '%a, %d %b %Y %H:%M:%S %z')
+    except ValueError:
+        try:
+            # Try parsing created_at if published date fails
+            pub_date = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
+        except ValueError:
+            pub_date = datetime.now(timezone.utc)
+    if pub_date.tzinfo is None:
+        pub_date = pub_date.replace(tzinfo=timezone.utc)
+    return format_datetime(pub_date)
+
+def build_feed(title: str, link: str, description: str, entries: Iterable[Dict],
+               language: str = 'en') -> bytes:
+    """Serialize an RSS 2.0 feed straight to bytes.
+
+    ``entries`` are article rows with ai_title, ai_summary, link, published
+    and created_at. They are written in the order given. The output has no
+    build timestamp, so identical input always gives identical bytes.
+    """
+    buffer = io.BytesIO()
+    write = buffer.write
+    write(
+        (
+            "<?xml version='1.0' encoding='UTF-8'?>\n"
+            '<rss version="2.0"><channel>'
+            f'<title>{escape(title)}</title>'
+            f'<link>{escape(link)}</link>'
+            f'<description>{escape(description)}</description>'
+            '<docs>http://www.rssboard.org/rss-specification</docs>'
+            '<generator>rss-category</generator>'
+            f'<language>{escape(language)}</language>'
+        ).encode('utf-8')
+    )
+    for article in entries:
+        pub_date = format_pub_date(article.get('published') or '', article.get('created_at') or '')
+        write(
+            (
+                '<item>'
+                f"<title>{escape(article.get('ai_title') or 'No Title')}</title>"
+                f"<link>{escape(article.get('link') or '#')}</link>"
+                f"<description>{escape(article.get('ai_summary') or 'No Summary')}</description>"
+                f'<pubDate>{pub_date}</pubDate>'
+                '</item>'
+            ).encode('utf-8')
+        )
+    write(b'</channel></rss>\n')
+    return buffer.getvalue()
+
+def compress(feed: bytes) -> bytes:
+    """Deterministic gzip variant of a feed"""
+    return gzip.compress(feed, compresslevel=9, mtime=0)
+
+def feed_hash(feed: bytes) -> str:
+    return hashlib.sha256(feed).hexdigest()
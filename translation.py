@@ -0,0 +1,204 @@
+import asyncio
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from deep_translator import GoogleTranslator
+from logger_config import setup_logger
+
+logger = setup_logger('translation')
+
+# Common English function words used for language detection. Words that are
+# also common in Polish ("a", "to", "on", "no") are deliberately left out.
+ENGLISH_STOPWORDS = frozenset("""
+    an the and or but of in at by for from with as is are was were be been
+    has have had will would can could this that these those it its not after over
+    about into than new says said who what when how why
+""".split())
+
+# Google Translate rejects requests longer than this
+MAX_REQUEST_CHARS = 5000
+
+def is_probably_english(text: str) -> bool:
+    """Cheap local check that text is already English.
+
+    Text with accented letters (Polish diacritics etc.) is never treated as
+    English; otherwise enough common English function words must be present.
+    """
+    words = re.findall(r"[^\W\d_]+", text.lower())
+    if not words:
+        return True
+    letters = sum(len(word) for word in words)
+    non_ascii = sum(1 for word in words for ch in word if ord(ch) > 127)
+    if non_ascii / letters > 0.01:
+        return False
+    hits = sum(1 for word in words if word in ENGLISH_STOPWORDS)
+    return hits >= 1 and hits / len(words) >= 0.12
+
+class TokenBucket:
+    """Async token-bucket rate limiter"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until a token is available and take it"""
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class TranslationCache:
+    """SQLite cache of translations keyed by content hash and language pair"""
+
+    def __init__(self, path: str, max_age_days: int):
+        cache_dir = os.path.dirname(path)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS translations (
+                content_hash TEXT NOT NULL,
+                source TEXT NOT NULL,
+                target TEXT NOT NULL,
+                translated TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (content_hash, source, target)
+            )
+        """)
+        # Drop stale entries so the cache doesn't grow forever
+        self.conn.execute(
+            'DELETE FROM translations WHERE created_at < ?',
+            (time.time() - max_age_days * 86400,)
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def key(text: str) -> str:
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def get(self, text: str, source: str, target: str) -> Optional[str]:
+        row = self.conn.execute(
+            'SELECT translated FROM translations WHERE content_hash = ? AND source = ? AND target = ?',
+            (self.key(text), source, target)
+        ).fetchone()
+        return row[0] if row else None
+
+    def put(self, text: str, source: str, target: str, translated: str):
+        self.conn.execute(
+            'INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?)',
+            (self.key(text), source, target, translated, time.time())
+        )
+        self.conn.commit()
+
+class TranslationService:
+    """Batched, cached and rate-limited translation"""
+
+    def __init__(self, config: Dict[str, Any]):
+        self.source = config['source']
+        self.target = config['target']
+        self.batch_chars = min(config['batch_chars'], MAX_REQUEST_CHARS)
+        self.cache = TranslationCache(config['cache_file'], config['cache_max_age_days'])
+        self.limiter = TokenBucket(config['requests_per_second'], config['burst'])
+        self.skip_english = self.target.startswith('en')
+        # GoogleTranslator keeps per-request state, so each thread gets its own
+        self._local = threading.local()
+        self.stats = {'cached': 0, 'skipped': 0, 'translated': 0, 'requests': 0}
+
+    def _translate_sync(self, text: str) -> str:
+        translator = getattr(self._local, 'translator', None)
+        if translator is None:
+            translator = GoogleTranslator(source=self.source, target=self.target)
+            self._local.translator = translator
+        return translator.translate(text)
+
+    async def _request(self, text: str) -> str:
+        await self.limiter.acquire()
+        self.stats['requests'] += 1
+        return await asyncio.to_thread(self._translate_sync, text)
+
+    async def _translate_chunk(self, texts: List[str]) -> List[Optional[str]]:
+        """Translate several single-line texts in one request, one per line"""
+        if len(texts) > 1:
+            try:
+                translated = (await self._request('\n'.join(texts))) or ''
+                lines = translated.split('\n')
+                if len(lines) == len(texts):
+                    return [line.strip() for line in lines]
+                logger.warning(f"Batch of {len(texts)} came back as {len(lines)} lines, retrying one by one")
+            except Exception as e:
+                logger.warning(f"Batch translation failed, retrying one by one: {str(e)}")
+
+        results = []
+        for text in texts:
+            try:
+                results.append(await self._request(text))
+            except Exception as e:
+                logger.error(f"Error translating text: {str(e)}")
+                results.append(None)
+        return results
+
+    async def translate_many(self, texts: List[str]) -> List[Optional[str]]:
+        """Translate a list of texts; failed translations come back as None"""
+        results: List[Optional[str]] = [None] * len(texts)
+        pending: Dict[str, List[int]] = {}
+
+        for index, text in enumerate(texts):
+            # Batches are split on newlines, so inputs must be single lines
+            text = ' '.join(text.split())
+            if not text:
+                results[index] = ''
+            elif self.skip_english and is_probably_english(text):
+                results[index] = text
+                self.stats['skipped'] += 1
+            else:
+                cached = self.cache.get(text, self.source, self.target)
+                if cached is not None:
+                    results[index] = cached
+                    self.stats['cached'] += 1
+                else:
+                    pending.setdefault(text, []).append(index)
+
+        # Pack unique texts into requests under the size limit
+        chunks, chunk, size = [], [], 0
+        for text in pending:
+            if chunk and size + len(text) + 1 > self.batch_chars:
+                chunks.append(chunk)
+                chunk, size = [], 0
+            chunk.append(text)
+            size += len(text) + 1
+        if chunk:
+            chunks.append(chunk)
+
+        for chunk in chunks:
+            for text, translated in zip(chunk, await self._translate_chunk(chunk)):
+                if translated is None:
+                    continue
+                self.cache.put(text, self.source, self.target, translated)
+                self.stats['translated'] += 1
+                for index in pending[text]:
+                    results[index] = translated
+        return results
+
+    def reset_stats(self):
+        for key in self.stats:
+            self.stats[key] = 0
+
+    def summary(self) -> str:
+        """One-line description of this cycle's translation work"""
+        return (
+            f"{self.stats['translated']} translated in {self.stats['requests']} requests, "
+            f"{self.stats['cached']} from cache, {self.stats['skipped']} already English"
+        )
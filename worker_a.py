@@ -1,33 +1,26 @@
 import asyncio
-import time
 from datetime import datetime
-from a import main as article_processor
+from a import CONFIG, run_continuously as article_processor, shutdown as article_processor_shutdown
 from logger_config import setup_logger
+from metrics import start_endpoint
 from rich.console import Console
 from rich.panel import Panel
-from rich.progress import Progress, SpinnerColumn, TextColumn
 
 # Initialize logger and console
 logger = setup_logger('article_worker')
 console = Console()
 
 async def job():
-    """Run the article processor job"""
-    try:
-        current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        console.print(Panel.fit(
-            f"[bold blue]Article Processor Worker[/bold blue]\n"
-            f"[cyan]Starting job at: {current_time}[/cyan]"
-        ))
-        
-        # Run the article processor
-        await article_processor()
-        
-        console.print("[bold green]✓ Job cycle completed successfully![/bold green]\n")
-        
-    except Exception as e:
-        logger.error(f"Error in worker job: {str(e)}", exc_info=True)
-        console.print(f"[bold red]✗ Job cycle failed: {str(e)}[/bold red]\n")
+    """Run the article processor until it stops or fails"""
+    current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    console.print(Panel.fit(
+        f"[bold blue]Article Processor Worker[/bold blue]\n"
+        f"[cyan]Starting at: {current_time}[/cyan]"
+    ))
+    
+    # Feeds are polled on their own adaptive schedules rather than in
+    # fixed cycles, so the processor runs continuously
+    await article_processor()
 
 async def main():
     """Main worker function"""
@@ -36,38 +29,29 @@ async def main():
         "[cyan]Worker started. Will run continuously.[/cyan]"
     ))
     
-    cycle_count = 0
+    # Optional /metrics endpoint for this process
+    start_endpoint(CONFIG['metrics'], 'worker_a')
     
-    while True:
-        try:
-            cycle_count += 1
-            
-            with Progress(
-                SpinnerColumn(),
-                TextColumn("[bold blue]Status:"),
-                console=console
-            ) as progress:
-                progress.add_task(f"[cyan]Starting cycle #{cycle_count}...")
-                
-                # Run the job
+    try:
+        while True:
+            try:
                 await job()
                 
-                # Add a small delay between cycles
-                progress.add_task("[yellow]Waiting 5 seconds before next cycle...")
-                await asyncio.sleep(5)
-                
-        except KeyboardInterrupt:
-            console.print("\n[yellow]Worker stopped by user[/yellow]")
-            break
-        except Exception as e:
-            logger.error(f"Error in main worker loop: {str(e)}", exc_info=True)
-            console.print(f"[bold red]Worker error: {str(e)}[/bold red]")
-            # Wait a minute before retrying on error
-            console.print("[yellow]Waiting 60 seconds before retry...[/yellow]")
-            await asyncio.sleep(60)
+            except KeyboardInterrupt:
+                console.print("\n[yellow]Worker stopped by user[/yellow]")
+                break
+            except Exception as e:
+                logger.error(f"Error in main worker loop: {str(e)}", exc_info=True)
+                console.print(f"[bold red]Worker error: {str(e)}[/bold red]")
+                # Wait a minute before retrying on error
+                console.print("[yellow]Waiting 60 seconds before retry...[/yellow]")
+                await asyncio.sleep(60)
+    finally:
+        # Close the HTTP session kept open between cycles
+        await article_processor_shutdown()
 
 if __name__ == "__main__":
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
-        console.print("\n[yellow]Worker stopped by user[/yellow]") 
\ No newline at end of file
+        console.print("\n[yellow]Worker stopped by user[/yellow]")
@@ -1,8 +1,11 @@
 import time
 import schedule
 from datetime import datetime
-from b import main as rss_generator
+from b import main as rss_generator, CONFIG, supabase
 from logger_config import setup_logger
+from rss_notify import drain
+from metrics import start_endpoint
+from retention import RetentionJob
 from rich.console import Console
 from rich.panel import Panel
 
@@ -10,17 +13,18 @@ from rich.panel import Panel
 logger = setup_logger('rss_worker')
 console = Console()
 
-def job():
+def job(categories=None):
     """Run the RSS generator job"""
     try:
         current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        trigger = f"{len(categories)} notified categories" if categories else "scheduled run"
         console.print(Panel.fit(
             f"[bold blue]RSS Feed Generator Worker[/bold blue]\n"
-            f"[cyan]Starting job at: {current_time}[/cyan]"
+            f"[cyan]Starting job at: {current_time} ({trigger})[/cyan]"
         ))
         
         # Run the RSS generator
-        rss_generator()
+        rss_generator(categories)
         
         console.print("[bold green]✓ Job completed successfully![/bold green]\n")
         
@@ -28,24 +32,69 @@ def job():
         logger.error(f"Error in worker job: {str(e)}", exc_info=True)
         console.print(f"[bold red]✗ Job failed: {str(e)}[/bold red]\n")
 
+def retention_job():
+    """Archive and delete expired articles"""
+    try:
+        result = RetentionJob(supabase, CONFIG['retention']).run()
+        if not result['skipped']:
+            console.print(
+                f"[green]✓ Archived and deleted {result['archived']} old articles"
+                f"{'' if result['complete'] else ' (more left for the next run)'}[/green]"
+            )
+    except Exception as e:
+        logger.error(f"Error in retention job: {str(e)}", exc_info=True)
+        console.print(f"[bold red]✗ Retention job failed: {str(e)}[/bold red]")
+
 def main():
     """Main worker function"""
+    settings = CONFIG['notify']
     console.print(Panel.fit(
         "[bold blue]RSS Feed Generator Worker[/bold blue]\n"
-        "[cyan]Worker started. Will run every 10 minutes.[/cyan]"
+        f"[cyan]Worker started. Will run when articles are saved, "
+        f"and every {settings['fallback_minutes']} minutes.[/cyan]"
     ))
     
-    # Schedule the job to run every 10 minutes
-    schedule.every(10).minutes.do(job)
+    # Optional /metrics endpoint for this process
+    start_endpoint(CONFIG['metrics'], 'worker_b')
+    
+    # Fallback for missed notifications and deleted articles
+    schedule.every(settings['fallback_minutes']).minutes.do(job)
+    
+    # Old articles are archived and deleted on their own, slower schedule
+    if CONFIG['retention']['enabled']:
+        schedule.every(CONFIG['retention']['interval_minutes']).minutes.do(retention_job)
+        retention_job()
+    
+    # Events from before startup are covered by the first run
+    drain(settings['spool_dir'])
     
     # Run the job immediately on startup
     job()
     
+    # Coalesce notifications: regenerate once they stop arriving for
+    # `debounce` seconds, or `max_delay` after the first one at the latest
+    pending = set()
+    first_event = last_event = None
+    
     # Keep the script running
     while True:
         try:
             schedule.run_pending()
-            time.sleep(1)
+            
+            categories = drain(settings['spool_dir'])
+            now = time.monotonic()
+            if categories:
+                pending |= categories
+                last_event = now
+                first_event = first_event or now
+            
+            if pending and (now - last_event >= settings['debounce']
+                            or now - first_event >= settings['max_delay']):
+                job(pending)
+                pending = set()
+                first_event = last_event = None
+            
+            time.sleep(settings['poll_interval'])
         except KeyboardInterrupt:
             console.print("\n[yellow]Worker stopped by user[/yellow]")
             break
@@ -55,4 +104,4 @@ def main():
             time.sleep(60)  # Wait a minute before retrying
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main() 